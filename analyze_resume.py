@@ -1,20 +1,159 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
 import sys
 import os
 import json
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 # Add the ml directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'ml'))
 
-from resume_analyzer import ResumeAnalyzer
+from resume_analyzer import ResumeAnalyzer, InputTooLargeError, init_analysis_worker
+from result_cache import ResultCache
+from model_store import ModelRegistry
+from micro_batch import MicroBatcher
+from bulk_analysis import ArchiveError, iter_archive_members, analyze_members, to_ndjson
+from text_extraction import ExtractionError, TextExtractor
+from metrics import REGISTRY, SIZE_BUCKETS
+from incremental_analysis import SessionStore
+from near_duplicates import NearDuplicateIndex
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Request metrics for /api/metrics; disable all collection with NEXUS_METRICS=0
+HTTP_REQUESTS = REGISTRY.counter(
+    'nexus_http_requests_total', 'HTTP requests by endpoint and status', labelnames=('endpoint', 'status')
+)
+HTTP_ERRORS = REGISTRY.counter(
+    'nexus_http_errors_total', 'HTTP responses with a 4xx or 5xx status', labelnames=('endpoint', 'status')
+)
+HTTP_SECONDS = REGISTRY.histogram(
+    'nexus_http_request_seconds', 'Time until the response is returned, by endpoint', labelnames=('endpoint',)
+)
+HTTP_STAGE_SECONDS = REGISTRY.histogram(
+    'nexus_http_stage_seconds', 'Time spent in each stage of a request', labelnames=('endpoint', 'stage')
+)
+UPLOAD_BYTES = REGISTRY.histogram(
+    'nexus_upload_bytes', 'Size of uploaded resumes in bytes', buckets=SIZE_BUCKETS, labelnames=('endpoint',)
+)
+RESULT_CACHE_LOOKUPS = REGISTRY.counter(
+    'nexus_result_cache_lookups_total', 'Analysis cache lookups by result', labelnames=('result',)
+)
+NEAR_DUPLICATES = REGISTRY.counter(
+    'nexus_near_duplicates_total', 'Near-duplicate resume submissions by how they were answered',
+    labelnames=('action',)
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Label by route pattern rather than raw path to keep the number of series bounded
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    status = str(response.status_code)
+    HTTP_REQUESTS.inc(endpoint, status)
+    if response.status_code >= 400:
+        HTTP_ERRORS.inc(endpoint, status)
+    if 'request_start' in g:
+        HTTP_SECONDS.observe(time.perf_counter() - g.request_start, endpoint)
+    return response
+
 # Initialize the resume analyzer
 analyzer = ResumeAnalyzer()
 
+# Hot-reload trained models published to NEXUS_MODEL_DIR without restarting
+model_registry = None
+if os.environ.get('NEXUS_MODEL_DIR'):
+    model_registry = ModelRegistry(os.environ['NEXUS_MODEL_DIR'])
+    model_registry.watch(analyzer, interval=float(os.environ.get('NEXUS_MODEL_POLL_INTERVAL', 30)))
+
+def predict_category_batch(requests):
+    # requests are (resume_text, top_k) pairs collected from concurrent calls
+    top_k = max(k for _, k in requests)
+    predictions = analyzer.predict_category([text for text, _ in requests], top_k)
+    return [prediction[:k] for prediction, (_, k) in zip(predictions, requests)]
+
+# Concurrent single-resume predictions share one model call
+category_batcher = MicroBatcher(
+    predict_category_batch,
+    max_batch_size=int(os.environ.get('NEXUS_PREDICT_BATCH_SIZE', 64)),
+    max_wait=float(os.environ.get('NEXUS_PREDICT_BATCH_WAIT_MS', 5)) / 1000
+)
+
+# Cache of serialized analyses keyed by resume digest, job description and analyzer version
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('NEXUS_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('NEXUS_CACHE_TTL', 3600)),
+    directory=os.environ.get('NEXUS_CACHE_DIR') or None
+)
+
+# PDF and DOCX uploads are converted to text in isolated worker processes
+text_extractor = TextExtractor(
+    workers=int(os.environ.get('NEXUS_EXTRACT_WORKERS', 2)),
+    timeout=float(os.environ.get('NEXUS_EXTRACT_TIMEOUT', 10)),
+    max_bytes=int(os.environ.get('NEXUS_EXTRACT_MAX_BYTES', 10 * 1024 * 1024)),
+    max_pages=int(os.environ.get('NEXUS_EXTRACT_MAX_PAGES', 20)),
+    cache=ResultCache(
+        max_entries=int(os.environ.get('NEXUS_EXTRACT_CACHE_SIZE', 256)),
+        ttl=None,
+        directory=os.environ.get('NEXUS_EXTRACT_CACHE_DIR') or None
+    )
+)
+
+# Near-duplicate submissions: 'flag' marks them with X-Near-Duplicate-Of, 'serve' also
+# answers with the earlier resume's analysis while it is cached, 'off' skips detection.
+# The index is kept in memory by default, about 1.2 GB per million resumes, or in the
+# SQLite file NEXUS_NEAR_DUPLICATE_DB, about 1 GB of disk per million, which survives restarts.
+# NEXUS_NEAR_DUPLICATE_MAX_ENTRIES optionally bounds it, dropping the oldest resumes.
+NEAR_DUPLICATE_MODE = os.environ.get('NEXUS_NEAR_DUPLICATES', 'flag')
+near_duplicates = None
+if NEAR_DUPLICATE_MODE != 'off':
+    near_duplicates = NearDuplicateIndex(
+        threshold=float(os.environ.get('NEXUS_NEAR_DUPLICATE_THRESHOLD', 0.85)),
+        path=os.environ.get('NEXUS_NEAR_DUPLICATE_DB') or None,
+        max_entries=int(os.environ['NEXUS_NEAR_DUPLICATE_MAX_ENTRIES'])
+        if os.environ.get('NEXUS_NEAR_DUPLICATE_MAX_ENTRIES') else None
+    )
+
+# Editor sessions that re-analyze only the paragraphs changed since the last request
+analysis_sessions = SessionStore(
+    analyzer,
+    max_sessions=int(os.environ.get('NEXUS_MAX_SESSIONS', 1000)),
+    ttl=float(os.environ.get('NEXUS_SESSION_TTL', 1800))
+)
+
+# Process pool for bulk archive analysis, started on first use
+BULK_WORKERS = int(os.environ.get('NEXUS_BULK_WORKERS', os.cpu_count() or 1))
+bulk_executor = None
+bulk_executor_lock = threading.Lock()
+
+def get_bulk_executor():
+    global bulk_executor
+    with bulk_executor_lock:
+        if bulk_executor is None:
+            bulk_executor = ProcessPoolExecutor(
+                max_workers=BULK_WORKERS,
+                initializer=init_analysis_worker,
+                initargs=(analyzer,)
+            )
+        return bulk_executor
+
+def discard_bulk_executor(executor):
+    """Drop a broken bulk pool so the next request starts a new one"""
+    global bulk_executor
+    with bulk_executor_lock:
+        if bulk_executor is executor:
+            bulk_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
 @app.route('/api/analyze-resume', methods=['POST'])
 def analyze_resume():
     try:
@@ -29,23 +168,230 @@ def analyze_resume():
         if file.filename == '':
             return jsonify({'error': 'No resume file selected'}), 400
         
+        timer = REGISTRY.stage_timer(HTTP_STAGE_SECONDS, '/api/analyze-resume')
+        
         # Read the file content
-        resume_text = file.read().decode('utf-8')
+        resume_bytes = file.read()
+        UPLOAD_BYTES.observe(len(resume_bytes), '/api/analyze-resume')
         
         # Get job description if provided
         job_description = request.form.get('jobDescription', None)
+        timer.mark('read_upload')
         
-        # Analyze the resume
-        analysis = analyzer.analyze_resume(resume_text, job_description)
+        # Serve repeated submissions from the cache
+        resume_id = ResultCache.make_key(resume_bytes)
+        cache_key = ResultCache.make_key(resume_id, job_description, analyzer.version)
+        body = result_cache.get(cache_key)
+        timer.mark('cache_lookup')
+        RESULT_CACHE_LOOKUPS.inc('miss' if body is None else 'hit')
+        headers = {}
+        if body is None:
+            # Extract the text of PDF and DOCX uploads
+            resume_text = text_extractor.extract(resume_bytes)
+            # Reject oversized resumes before any work on their text
+            analyzer.check_size(resume_text)
+            timer.mark('decode')
+            
+            signature = None
+            if near_duplicates is not None:
+                signature = near_duplicates.signature(resume_text)
+                duplicate = near_duplicates.query(signature, resume_id)
+                timer.mark('near_duplicates')
+                if duplicate is not None:
+                    duplicate_id, similarity = duplicate
+                    headers = {
+                        'X-Near-Duplicate-Of': duplicate_id,
+                        'X-Near-Duplicate-Similarity': f'{similarity:.2f}'
+                    }
+                    if NEAR_DUPLICATE_MODE == 'serve':
+                        body = result_cache.get(ResultCache.make_key(duplicate_id, job_description, analyzer.version))
+                    NEAR_DUPLICATES.inc('flagged' if body is None else 'served')
+            
+            if body is None:
+                analysis = analyzer.analyze_resume(resume_text, job_description)
+                timer.mark('analyze')
+                body = jsonify(analysis).get_data()
+                timer.mark('serialize')
+                # Index only resumes that were analyzed successfully
+                if signature is not None:
+                    near_duplicates.find_or_add(resume_id, signature)
+            result_cache.set(cache_key, body)
         
-        return jsonify(analysis)
+        return app.response_class(body, mimetype='application/json', headers=headers)
     
+    except ExtractionError as e:
+        return jsonify({'error': str(e)}), 422
+    except InputTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze-incremental', methods=['POST'])
+def analyze_incremental():
+    try:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({'error': 'Request body must be a JSON object'}), 400
+        if not isinstance(payload.get('resumeText'), str):
+            return jsonify({'error': 'resumeText must be a string'}), 400
+
+        job_description = payload.get('jobDescription')
+        if job_description is not None and not isinstance(job_description, str):
+            return jsonify({'error': 'jobDescription must be a string'}), 400
+
+        # Unknown or expired session ids start a new session; clients send back the returned id
+        session_id, session = analysis_sessions.get(payload.get('sessionId'))
+        analysis = session.analyze(payload['resumeText'], job_description)
+        return jsonify({'sessionId': session_id, 'analysis': analysis})
+
+    except InputTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze-incremental/<session_id>', methods=['DELETE'])
+def close_incremental_session(session_id):
+    if not analysis_sessions.close(session_id):
+        return jsonify({'error': 'Unknown session'}), 404
+    return jsonify({'closed': session_id})
+
+def form_top_k(default):
+    # topK form field; None when it is given but is not a positive integer
+    value = request.form.get('topK')
+    if value is None:
+        return default
+    try:
+        top_k = int(value)
+    except ValueError:
+        return None
+    return top_k if top_k >= 1 else None
+
+@app.route('/api/rank-candidates', methods=['POST'])
+def rank_candidates():
+    try:
+        files = [file for file in request.files.getlist('resumes') if file.filename != '']
+        if not files:
+            return jsonify({'error': 'No resume files provided'}), 400
+
+        job_description = request.form.get('jobDescription', '')
+        if not job_description.strip():
+            return jsonify({'error': 'No job description provided'}), 400
+
+        top_k = form_top_k(10)
+        if top_k is None:
+            return jsonify({'error': 'topK must be a positive integer'}), 400
+
+        # Decode lazily so only the analyses kept in the top-k stay in memory
+        resume_texts = (text_extractor.extract(file.read()) for file in files)
+        ranked = analyzer.rank_candidates(job_description, resume_texts, top_k)
+
+        candidates = [
+            {
+                'rank': rank,
+                'filename': files[candidate['index']].filename,
+                'score': candidate['score'],
+                'analysis': candidate['analysis']
+            }
+            for rank, candidate in enumerate(ranked, start=1)
+        ]
+        return jsonify({'candidates': candidates, 'totalCandidates': len(files)})
+
+    except ExtractionError as e:
+        return jsonify({'error': str(e)}), 422
+    except InputTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/predict-category', methods=['POST'])
+def predict_category():
+    try:
+        payload = request.get_json(silent=True)
+        if payload is not None:
+            if not isinstance(payload, dict):
+                return jsonify({'error': 'Request body must be a JSON object'}), 400
+            # JSON batches go straight to the model as one call
+            texts = payload.get('texts')
+            top_k = payload.get('topK', 3)
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                return jsonify({'error': 'texts must be a list of strings'}), 400
+            if not isinstance(top_k, int) or top_k < 1:
+                return jsonify({'error': 'topK must be a positive integer'}), 400
+            for text in texts:
+                analyzer.check_size(text)
+            return jsonify({'predictions': analyzer.predict_category(texts, top_k)})
+
+        if 'resume' not in request.files or request.files['resume'].filename == '':
+            return jsonify({'error': 'No resume file provided'}), 400
+
+        top_k = form_top_k(3)
+        if top_k is None:
+            return jsonify({'error': 'topK must be a positive integer'}), 400
+
+        resume_text = text_extractor.extract(request.files['resume'].read())
+        # Reject oversized resumes here so they cannot fail a shared batch
+        analyzer.check_size(resume_text)
+        return jsonify({'predictions': category_batcher((resume_text, top_k))})
+
+    except ExtractionError as e:
+        return jsonify({'error': str(e)}), 422
+    except InputTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/analyze-bulk', methods=['POST'])
+def analyze_bulk():
+    if 'archive' not in request.files or request.files['archive'].filename == '':
+        return jsonify({'error': 'No archive file provided'}), 400
+
+    job_description = request.form.get('jobDescription', None)
+
+    # The upload is closed when the view returns, before the response body is
+    # streamed, so keep a private copy of the compressed archive; it stays in
+    # memory up to NEXUS_BULK_SPOOL_SIZE bytes and spills to a temporary file beyond
+    archive = tempfile.SpooledTemporaryFile(max_size=int(os.environ.get('NEXUS_BULK_SPOOL_SIZE', 8 * 1024 * 1024)))
+    shutil.copyfileobj(request.files['archive'].stream, archive)
+    archive.seek(0)
+    try:
+        members = iter_archive_members(archive)
+    except ArchiveError as e:
+        archive.close()
+        return jsonify({'error': str(e)}), 400
+
+    max_pending = int(os.environ.get('NEXUS_BULK_MAX_PENDING', BULK_WORKERS * 2))
+
+    def generate():
+        executor = get_bulk_executor()
+        try:
+            # One JSON line per archive member, sent as soon as its analysis finishes
+            yield from to_ndjson(analyze_members(members, job_description, executor, max_pending,
+                                               extract=text_extractor.extract))
+        except BrokenProcessPool:
+            # A worker died, e.g. killed for memory, which breaks the whole pool;
+            # replace it for later requests and end this stream with an error record
+            discard_bulk_executor(executor)
+            yield json.dumps({'error': 'Analysis workers stopped unexpectedly; retry the remaining files'}) + '\n'
+        finally:
+            archive.close()
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy'}), 200
+    return jsonify({
+        'status': 'healthy',
+        'cache': result_cache.stats(),
+        'modelVersion': analyzer.model_version
+    }), 200
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    if not REGISTRY.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return app.response_class(REGISTRY.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,184 @@
+"""
+ASGI serving mode for the resume analyzer
+
+Run with:
+    uvicorn asgi_app:app --host 0.0.0.0 --port 5000
+
+Serves the same /api/analyze-resume and /api/health contract as the Flask
+app in analyze_resume.py. Uploads are streamed by the multipart parser
+instead of being read on a request thread, and analyses run on a bounded
+process pool. At most NEXUS_MAX_IN_FLIGHT analyses run at once and up to
+NEXUS_MAX_QUEUED more wait for a slot. Requests beyond that are rejected
+with 429 before their body is read, and requests that wait longer than
+NEXUS_QUEUE_TIMEOUT seconds get a 503.
+"""
+import asyncio
+import contextlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from resume_analyzer import ResumeAnalyzer, InputTooLargeError, init_analysis_worker, analyze_in_worker
+from result_cache import ResultCache
+from text_extraction import ExtractionError, TextExtractor
+
+WORKERS = int(os.environ.get('NEXUS_WORKERS', os.cpu_count() or 1))
+MAX_IN_FLIGHT = int(os.environ.get('NEXUS_MAX_IN_FLIGHT', WORKERS))
+MAX_QUEUED = int(os.environ.get('NEXUS_MAX_QUEUED', WORKERS * 4))
+QUEUE_TIMEOUT = float(os.environ.get('NEXUS_QUEUE_TIMEOUT', 30))
+
+# Initialize the resume analyzer; every pool worker gets a copy at startup
+analyzer = ResumeAnalyzer()
+
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('NEXUS_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('NEXUS_CACHE_TTL', 3600)),
+    directory=os.environ.get('NEXUS_CACHE_DIR') or None
+)
+
+# PDF and DOCX uploads are converted to text in isolated worker processes,
+# with the same settings as the Flask app
+text_extractor = TextExtractor(
+    workers=int(os.environ.get('NEXUS_EXTRACT_WORKERS', 2)),
+    timeout=float(os.environ.get('NEXUS_EXTRACT_TIMEOUT', 10)),
+    max_bytes=int(os.environ.get('NEXUS_EXTRACT_MAX_BYTES', 10 * 1024 * 1024)),
+    max_pages=int(os.environ.get('NEXUS_EXTRACT_MAX_PAGES', 20)),
+    cache=ResultCache(
+        max_entries=int(os.environ.get('NEXUS_EXTRACT_CACHE_SIZE', 256)),
+        ttl=None,
+        directory=os.environ.get('NEXUS_EXTRACT_CACHE_DIR') or None
+    )
+)
+
+
+class AdmissionLimiter:
+    """
+    Bounds the number of requests admitted to the analysis pool
+
+    Parameters:
+    max_in_flight (int): Analyses allowed to run at the same time
+    max_queued (int): Admitted requests allowed to wait for a running slot
+    """
+
+    def __init__(self, max_in_flight, max_queued):
+        self.max_in_flight = max_in_flight
+        self.capacity = max_in_flight + max_queued
+        self.admitted = 0
+        self.slots = asyncio.Semaphore(max_in_flight)
+
+    def try_admit(self):
+        if self.admitted >= self.capacity:
+            return False
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.admitted -= 1
+
+    def stats(self):
+        return {
+            'admitted': self.admitted,
+            'maxInFlight': self.max_in_flight,
+            'capacity': self.capacity
+        }
+
+
+class ServiceState:
+    executor = None
+    limiter = None
+
+
+state = ServiceState()
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Created inside the running event loop
+    state.limiter = AdmissionLimiter(MAX_IN_FLIGHT, MAX_QUEUED)
+    state.executor = ProcessPoolExecutor(max_workers=WORKERS, initializer=init_analysis_worker,
+                                         initargs=(analyzer,))
+    try:
+        yield
+    finally:
+        state.executor.shutdown(cancel_futures=True)
+        text_extractor.close()
+
+
+async def analyze_resume(request):
+    limiter = state.limiter
+    if not limiter.try_admit():
+        return JSONResponse({'error': 'Server is busy, please retry shortly'}, status_code=429,
+                            headers={'Retry-After': '1'})
+
+    try:
+        form = await request.form()
+
+        # Check if the request has the file part
+        file = form.get('resume')
+        if file is None or isinstance(file, str):
+            return JSONResponse({'error': 'No resume file provided'}, status_code=400)
+
+        # If the user does not select a file, the browser submits an
+        # empty file without a filename
+        if file.filename == '':
+            return JSONResponse({'error': 'No resume file selected'}, status_code=400)
+
+        resume_bytes = await file.read()
+        job_description = form.get('jobDescription', None)
+
+        # Serve repeated submissions from the cache; keys match the Flask app's
+        cache_key = ResultCache.make_key(ResultCache.make_key(resume_bytes), job_description, analyzer.version)
+        body = result_cache.get(cache_key)
+        if body is None:
+            # Extraction blocks on a worker process, so it runs off the event loop
+            resume_text = await run_in_threadpool(text_extractor.extract, resume_bytes)
+            try:
+                await asyncio.wait_for(limiter.slots.acquire(), QUEUE_TIMEOUT)
+            except asyncio.TimeoutError:
+                return JSONResponse({'error': 'Analysis queue is full, please retry shortly'}, status_code=503,
+                                    headers={'Retry-After': '5'})
+            try:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(state.executor, analyze_in_worker, [resume_text],
+                                                     job_description)
+            finally:
+                limiter.slots.release()
+
+            body = JSONResponse(results[0]).body
+            result_cache.set(cache_key, body)
+
+        return Response(body, media_type='application/json')
+
+    except ExtractionError as e:
+        return JSONResponse({'error': str(e)}, status_code=422)
+    except InputTooLargeError as e:
+        return JSONResponse({'error': str(e)}, status_code=413)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+    finally:
+        limiter.release()
+
+
+async def health_check(request):
+    return JSONResponse({
+        'status': 'healthy',
+        'cache': result_cache.stats(),
+        'admission': state.limiter.stats() if state.limiter else None
+    })
+
+
+app = Starlette(
+    routes=[
+        Route('/api/analyze-resume', analyze_resume, methods=['POST']),
+        Route('/api/health', health_check, methods=['GET'])
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan
+)
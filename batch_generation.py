@@ -0,0 +1,260 @@
+"""
+Generate many documents from the rows of a CSV file with bounded concurrency
+
+Rows are generated on a thread pool of at most `concurrency` crews. When
+the provider answers with a rate limit error, the whole batch pauses for
+the advertised retry delay (or an exponential backoff with jitter), runs
+fewer crews at once for a while, and retries the row. A larger concurrency
+cap therefore raises throughput until the provider's limit is reached and
+then holds it there instead of failing rows.
+
+Settings:
+    NEXUS_BATCH_CONCURRENCY   Default number of concurrent generations
+    NEXUS_BATCH_MAX_RETRIES   Retries per row after rate limit errors
+    NEXUS_BATCH_MAX_ROWS      Largest accepted CSV
+"""
+import csv
+import io
+import os
+import random
+import re
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+BATCH_CONCURRENCY = int(os.environ.get('NEXUS_BATCH_CONCURRENCY', 4))
+BATCH_MAX_RETRIES = int(os.environ.get('NEXUS_BATCH_MAX_RETRIES', 5))
+BATCH_MAX_ROWS = int(os.environ.get('NEXUS_BATCH_MAX_ROWS', 1000))
+
+
+class BatchError(ValueError):
+    """Raised when a batch CSV cannot be used"""
+
+
+def _column_key(name):
+    # 'Job Title', 'job-title' and 'job_title' all name the same column
+    return re.sub(r'[^a-z0-9]+', '_', name.strip().lower()).strip('_')
+
+
+def read_batch_csv(data, fields, aliases=None, required=(), max_rows=BATCH_MAX_ROWS):
+    """
+    Read generation inputs from CSV
+
+    Parameters:
+    data (bytes): CSV file with a header row
+    fields (list): Input names; columns are matched ignoring case, spaces and punctuation
+    aliases (dict): Optional input name -> other accepted column names
+    required (tuple): Inputs whose column must exist and be filled in every row
+    max_rows (int): Most rows accepted
+
+    Returns:
+    list: One dict of inputs per non-empty row, missing columns as ''
+    """
+    try:
+        text = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise BatchError('CSV file must be UTF-8 encoded')
+
+    reader = csv.reader(io.StringIO(text))
+    header = next(reader, None)
+    if not header:
+        raise BatchError('CSV file is empty')
+
+    accepted = {}
+    for field in fields:
+        for name in (field,) + tuple((aliases or {}).get(field, ())):
+            accepted[_column_key(name)] = field
+    columns = {}
+    for position, name in enumerate(header):
+        field = accepted.get(_column_key(name))
+        if field is not None and field not in columns:
+            columns[field] = position
+
+    missing = [field for field in required if field not in columns]
+    if missing:
+        raise BatchError(f'CSV file is missing columns: {", ".join(missing)}')
+
+    rows = []
+    for line, values in enumerate(reader, start=2):
+        if not any(value.strip() for value in values):
+            continue
+        row = {field: values[columns[field]] if field in columns and columns[field] < len(values) else ''
+               for field in fields}
+        for field in required:
+            if not row[field].strip():
+                raise BatchError(f'Row {line} has no {field}')
+        rows.append(row)
+        if len(rows) > max_rows:
+            raise BatchError(f'CSV file has more than {max_rows} rows')
+    return rows
+
+
+def _error_chain(error):
+    # The error and the ones it was raised from, e.g. a provider error wrapped by CrewAI
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def is_rate_limited(error):
+    """Tell whether an error, or one it was raised from, is a provider rate limit"""
+    for cause in _error_chain(error):
+        if getattr(cause, 'status_code', None) == 429 or 'RateLimit' in type(cause).__name__:
+            return True
+        if 'rate limit' in str(cause).lower():
+            return True
+    return False
+
+
+def retry_after(error):
+    """Return the delay in seconds the provider asked for, if any"""
+    for cause in _error_chain(error):
+        headers = getattr(getattr(cause, 'response', None), 'headers', None) or {}
+        try:
+            return float(headers.get('retry-after'))
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def archive_name(index, title, extension='.txt'):
+    """Zip entry name for a generated row, e.g. '007-senior-data-engineer.txt'"""
+    slug = re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-')[:60] or 'untitled'
+    return f'{index + 1:03d}-{slug}{extension}'
+
+
+class BatchGenerator:
+    """
+    Run a generation function over many inputs with a concurrency cap
+
+    A rate limit error halves the number of generations allowed to run at
+    once, and every round of successes raises it by one again up to the cap,
+    so the batch settles just below the provider's limit instead of
+    repeatedly overshooting it.
+
+    Parameters:
+    generate (callable): Called with one row of inputs, returns the document
+    concurrency (int): Most generations running at once
+    max_retries (int): Retries per row after rate limit errors
+    base_delay (float): First backoff delay in seconds when the provider gives none
+    max_delay (float): Longest backoff delay in seconds
+    """
+
+    def __init__(self, generate, concurrency=BATCH_CONCURRENCY, max_retries=BATCH_MAX_RETRIES,
+                 base_delay=2.0, max_delay=60.0):
+        if concurrency < 1:
+            raise ValueError('concurrency must be at least 1')
+        self.generate = generate
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._limit = concurrency
+        self._active = 0
+        self._successes = 0
+        self._resume_at = 0.0
+        self._condition = threading.Condition()
+
+    def _acquire(self):
+        with self._condition:
+            while True:
+                delay = self._resume_at - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                elif self._active < self._limit:
+                    self._active += 1
+                    return
+                else:
+                    self._condition.wait()
+
+    def _release(self, backoff=None):
+        with self._condition:
+            self._active -= 1
+            now = time.monotonic()
+            if backoff is None:
+                self._successes += 1
+                if self._successes >= self._limit and self._limit < self.concurrency:
+                    self._limit += 1
+                    self._successes = 0
+            else:
+                # Calls already in flight when the limit hit fail too; count that as one signal
+                if self._resume_at <= now:
+                    self._limit = max(1, self._limit // 2)
+                    self._successes = 0
+                # Pause every worker, not only this one: the limit is shared
+                self._resume_at = max(self._resume_at, now + backoff)
+                self.retries += 1
+            self._condition.notify_all()
+
+    def _generate(self, inputs):
+        for attempt in range(self.max_retries + 1):
+            self._acquire()
+            try:
+                document = self.generate(inputs)
+            except Exception as e:
+                if attempt == self.max_retries or not is_rate_limited(e):
+                    self._release()
+                    raise
+                delay = retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * 2 ** attempt)
+                self._release(delay)
+                continue
+            self._release()
+            return document
+
+    def run(self, rows):
+        """
+        Generate every row and yield (index, document, error) as each finishes
+
+        Rows are yielded in completion order; error is None on success and
+        the exception otherwise. Closing the iterator early cancels the rows
+        that have not started.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            futures = {executor.submit(self._generate, row): index for index, row in enumerate(rows)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    yield index, future.result(), None
+                except Exception as e:
+                    yield index, None, e
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BatchArchive:
+    """
+    Zip of generated documents, written entry by entry as rows finish
+
+    Failed rows are listed in a failures.csv entry when the archive is closed.
+
+    Parameters:
+    fileobj: Writable binary file object
+    """
+
+    def __init__(self, fileobj):
+        self._zip = zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED)
+        self.documents = 0
+        self.failures = []
+
+    def add(self, name, content):
+        self._zip.writestr(name, content)
+        self.documents += 1
+
+    def add_failure(self, index, title, error):
+        self.failures.append((index + 1, title, str(error)))
+
+    def close(self):
+        if self.failures:
+            report = io.StringIO()
+            writer = csv.writer(report)
+            writer.writerow(['row', 'title', 'error'])
+            writer.writerows(sorted(self.failures))
+            self._zip.writestr('failures.csv', report.getvalue())
+        self._zip.close()
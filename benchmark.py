@@ -0,0 +1,324 @@
+"""
+Performance checks for the resume analyzer
+
+Usage:
+    python benchmark.py startup [--budget SECONDS] [--runs N] [--output FILE]
+    python benchmark.py scoring [--sizes N,N,...] [--repeat N] [--seed N] [--output FILE]
+                                [--baseline FILE] [--tolerance RATIO]
+    python benchmark.py adversarial [--sizes MB,MB,...] [--max-growth RATIO] [--seed N] [--output FILE]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# The scoring-only path (import, construct, analyze one resume) must stay under this
+STARTUP_BUDGET = 0.5
+
+# Modules that only training needs; none of them may be imported by the scoring path
+TRAINING_ONLY_MODULES = ["nltk", "sklearn", "pandas", "numpy", "scipy"]
+
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from resume_analyzer import ResumeAnalyzer
+analyzer = ResumeAnalyzer()
+analyzer.analyze_resume("Python developer with a Bachelor degree from a university.")
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+"""
+
+
+def measure_startup(runs=5):
+    """Time the scoring-only startup path in fresh interpreters"""
+    timings = []
+    loaded = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE % (TRAINING_ONLY_MODULES,)],
+            cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        probe = json.loads(output.strip().splitlines()[-1])
+        timings.append(probe["seconds"])
+        loaded.update(probe["loaded"])
+
+    return {
+        "runs": timings,
+        "median_seconds": statistics.median(timings),
+        "training_modules_loaded": sorted(loaded)
+    }
+
+
+# Resume lengths, in words, timed by the scoring benchmark
+SCORING_SIZES = [200, 1000, 5000, 20000]
+
+
+def _time_calls(fn, documents, repeat):
+    # Median and best per-call time in milliseconds over every document and repeat
+    timings = []
+    for _ in range(repeat):
+        for args in documents:
+            start = time.perf_counter()
+            fn(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "calls": len(timings)}
+
+
+def measure_scoring(sizes=SCORING_SIZES, documents=5, repeat=3, seed=0, skill_density=0.1,
+                    bullet_style="dot", jd_words=200):
+    """
+    Time each scoring stage of ResumeAnalyzer on synthetic resumes
+
+    Parameters:
+    sizes (list): Resume lengths in words
+    documents (int): Distinct resumes generated per size
+    repeat (int): Times each resume is scored per stage
+    seed (int): Seed for the synthetic corpus
+    skill_density (float): Share of free-text words replaced by skills
+    bullet_style (str): Bullet style of generated resumes
+    jd_words (int): Length of the job description
+
+    Returns:
+    dict: Settings and, per size, the timings of every stage
+    """
+    from resume_analyzer import ResumeAnalyzer
+    from synthetic_data import SyntheticCorpus
+
+    analyzer = ResumeAnalyzer()
+    corpus = SyntheticCorpus(analyzer.skills_keywords, analyzer.job_titles, seed)
+    job_description = corpus.job_description(jd_words)
+    # Warm up lazily built state so it is not charged to the first stage
+    analyzer.analyze_resume(corpus.resume(200), job_description)
+
+    results = {}
+    for size in sizes:
+        resumes = [corpus.resume(size, skill_density, bullet_style) for _ in range(documents)]
+        scored = []
+        for resume in resumes:
+            scores = (
+                analyzer.calculate_ats_score(resume, job_description),
+                analyzer.calculate_content_quality_score(resume),
+                analyzer.calculate_format_score(resume),
+                analyzer.calculate_skills_match_score(resume, job_description)
+            )
+            scored.append((resume,) + scores)
+
+        stages = {
+            "extract_skills": (analyzer.extract_skills, [(resume,) for resume in resumes]),
+            "calculate_ats_score": (analyzer.calculate_ats_score,
+                                    [(resume, job_description) for resume in resumes]),
+            "calculate_content_quality_score": (analyzer.calculate_content_quality_score,
+                                                [(resume,) for resume in resumes]),
+            "calculate_format_score": (analyzer.calculate_format_score, [(resume,) for resume in resumes]),
+            "calculate_skills_match_score": (analyzer.calculate_skills_match_score,
+                                             [(resume, job_description) for resume in resumes]),
+            "_generate_suggestions": (analyzer._generate_suggestions, scored),
+            "analyze_resume": (analyzer.analyze_resume, [(resume, job_description) for resume in resumes])
+        }
+        results[str(size)] = {
+            "characters": statistics.mean(len(resume) for resume in resumes),
+            "stages": {name: _time_calls(fn, args, repeat) for name, (fn, args) in stages.items()}
+        }
+
+    return {
+        "settings": {
+            "seed": seed,
+            "documents": documents,
+            "repeat": repeat,
+            "skill_density": skill_density,
+            "bullet_style": bullet_style,
+            "jd_words": jd_words,
+            "python": sys.version.split()[0]
+        },
+        "sizes": results
+    }
+
+
+def compare_scoring(results, baseline, tolerance):
+    """
+    List stages whose median time grew by more than tolerance against a baseline run
+
+    Returns:
+    list: Messages describing each regression
+    """
+    regressions = []
+    for size, current in results["sizes"].items():
+        previous = baseline.get("sizes", {}).get(size)
+        if previous is None:
+            continue
+        for stage, timing in current["stages"].items():
+            before = previous["stages"].get(stage)
+            if before and timing["median_ms"] > before["median_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{stage} at {size} words: {before['median_ms']:.3f} ms -> {timing['median_ms']:.3f} ms"
+                )
+    return regressions
+
+
+# Input sizes, in megabytes, timed by the adversarial benchmark
+ADVERSARIAL_SIZES = [0.25, 0.5, 1.0]
+
+# Allowed spread of seconds per megabyte between the smallest and largest size
+ADVERSARIAL_MAX_GROWTH = 3.0
+
+_FUZZ_ALPHABET = ["a", "Z", "1", "42", ".", "@", "$", "%", " percent", " users", "-", "•", "*", "_", " ", "\n",
+                  "x.com", "university", "work", "é", "+", "(", ")"]
+
+
+def adversarial_documents(characters, seed=0):
+    """
+    Build inputs aimed at backtracking and rescanning in the feature extractors
+
+    Returns:
+    dict: Case name mapped to a document of the given length
+    """
+    import random
+
+    def fill(unit):
+        return (unit * (characters // len(unit) + 1))[:characters]
+
+    rng = random.Random(seed)
+    fuzz = []
+    length = 0
+    while length < characters:
+        piece = rng.choice(_FUZZ_ALPHABET)
+        fuzz.append(piece)
+        length += len(piece)
+
+    return {
+        "digit_run": fill("1"),
+        "keywords_without_periods": fill("university work experience "),
+        "dotted_local_part": fill("a."),
+        "at_signs": fill("a.b@c"),
+        "dotted_domain": "x@" + fill("a.")[2:],
+        "numbered_lines": fill("1 2 3 4 5 "),
+        "fuzz": "".join(fuzz)[:characters]
+    }
+
+
+def measure_adversarial(sizes=ADVERSARIAL_SIZES, seed=0):
+    """
+    Time analyze_resume on adversarial inputs of growing size
+
+    Linear feature extraction keeps seconds per megabyte flat as the input
+    grows; the growth figure of each case is the largest seconds-per-MB
+    divided by the smallest.
+
+    Parameters:
+    sizes (list): Input sizes in megabytes
+    seed (int): Seed for the fuzz case
+
+    Returns:
+    dict: Per case, the timings at each size and the growth
+    """
+    from resume_analyzer import ResumeAnalyzer
+
+    characters = [int(size * 1024 * 1024) for size in sizes]
+    analyzer = ResumeAnalyzer(max_document_chars=max(characters))
+    analyzer.analyze_resume("Python developer.")
+
+    cases = {}
+    for size, count in zip(sizes, characters):
+        for name, document in adversarial_documents(count, seed).items():
+            start = time.perf_counter()
+            analyzer.analyze_resume(document)
+            elapsed = time.perf_counter() - start
+            cases.setdefault(name, {})[str(size)] = {"seconds": elapsed, "seconds_per_mb": elapsed / size}
+
+    results = {}
+    for name, timings in cases.items():
+        per_mb = [timing["seconds_per_mb"] for timing in timings.values()]
+        results[name] = {
+            "sizes": timings,
+            "worst_seconds_per_mb": max(per_mb),
+            "growth": max(per_mb) / max(min(per_mb), 1e-9)
+        }
+    return {"seed": seed, "cases": results}
+
+
+def _write_results(results, output):
+    text = json.dumps(results, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume analyzer performance checks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    startup = commands.add_parser("startup", help="Check the scoring-only startup time against a budget")
+    startup.add_argument("--budget", type=float, default=STARTUP_BUDGET, help="Maximum median seconds")
+    startup.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to time")
+    startup.add_argument("--output", help="Write the results as JSON to this file")
+
+    from synthetic_data import BULLET_STYLES
+
+    scoring = commands.add_parser("scoring", help="Time each scoring stage on synthetic resumes")
+    scoring.add_argument("--sizes", default=",".join(map(str, SCORING_SIZES)),
+                         help="Comma-separated resume lengths in words")
+    scoring.add_argument("--documents", type=int, default=5, help="Resumes generated per size")
+    scoring.add_argument("--repeat", type=int, default=3, help="Times each resume is scored per stage")
+    scoring.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus")
+    scoring.add_argument("--skill-density", type=float, default=0.1,
+                         help="Share of free-text words replaced by skills")
+    scoring.add_argument("--bullet-style", choices=sorted(BULLET_STYLES), default="dot")
+    scoring.add_argument("--jd-words", type=int, default=200, help="Length of the job description")
+    scoring.add_argument("--output", help="Write the results as JSON to this file")
+    scoring.add_argument("--baseline", help="Earlier results to compare against")
+    scoring.add_argument("--tolerance", type=float, default=0.2,
+                         help="Allowed slowdown against the baseline, as a ratio")
+
+    adversarial = commands.add_parser("adversarial",
+                                      help="Check that latency per MB stays flat on adversarial inputs")
+    adversarial.add_argument("--sizes", default=",".join(map(str, ADVERSARIAL_SIZES)),
+                             help="Comma-separated input sizes in megabytes")
+    adversarial.add_argument("--max-growth", type=float, default=ADVERSARIAL_MAX_GROWTH,
+                             help="Largest allowed ratio between seconds per MB at different sizes")
+    adversarial.add_argument("--seed", type=int, default=0, help="Seed for the fuzz case")
+    adversarial.add_argument("--output", help="Write the results as JSON to this file")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "startup":
+        results = measure_startup(args.runs)
+        results["budget_seconds"] = args.budget
+        _write_results(results, args.output)
+        if results["median_seconds"] > args.budget or results["training_modules_loaded"]:
+            print("Startup budget exceeded", file=sys.stderr)
+            return 1
+
+    elif args.command == "scoring":
+        sizes = [int(size) for size in args.sizes.split(",") if size]
+        results = measure_scoring(sizes, args.documents, args.repeat, args.seed, args.skill_density,
+                                  args.bullet_style, args.jd_words)
+        _write_results(results, args.output)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare_scoring(results, json.load(f), args.tolerance)
+            for message in regressions:
+                print("Regression: " + message, file=sys.stderr)
+            if regressions:
+                return 1
+
+    elif args.command == "adversarial":
+        sizes = [float(size) for size in args.sizes.split(",") if size]
+        results = measure_adversarial(sizes, args.seed)
+        results["max_growth"] = args.max_growth
+        _write_results(results, args.output)
+        superlinear = [name for name, case in results["cases"].items() if case["growth"] > args.max_growth]
+        if superlinear:
+            print("Latency per MB grew on: " + ", ".join(superlinear), file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+import json
+import tarfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from resume_analyzer import analyze_in_worker
+
+ZIP_MAGIC = (b'PK\x03\x04', b'PK\x05\x06')
+
+# Largest archive member that will be decompressed, in bytes
+MAX_MEMBER_SIZE = 5 * 1024 * 1024
+
+
+class ArchiveError(ValueError):
+    """Raised when an upload is not a readable zip or tar archive"""
+
+
+def _skip_member(name):
+    # Folders and metadata that archivers add next to the real files
+    base = name.rsplit('/', 1)[-1]
+    return name.startswith('__MACOSX/') or base.startswith('.') or not base
+
+
+def _read_limited(stream, max_member_size):
+    data = stream.read(max_member_size + 1)
+    if len(data) > max_member_size:
+        return None, f'Member exceeds the {max_member_size} byte limit'
+    return data, None
+
+
+def _iter_zip(archive, max_member_size):
+    with archive:
+        for info in archive.infolist():
+            if info.is_dir() or _skip_member(info.filename):
+                continue
+            try:
+                with archive.open(info) as stream:
+                    data, error = _read_limited(stream, max_member_size)
+            except Exception as e:
+                data, error = None, str(e)
+            yield info.filename, data, error
+
+
+def _iter_tar(archive, max_member_size):
+    with archive:
+        members = iter(archive)
+        while True:
+            try:
+                member = next(members, None)
+            except tarfile.TarError as e:
+                # A stream is only read as far as it is consumed, so corruption
+                # past the first member shows up here, partway through
+                raise ArchiveError(f'Archive is corrupt after the members already read: {e}')
+            if member is None:
+                return
+            if not member.isfile() or _skip_member(member.name):
+                continue
+            try:
+                data, error = _read_limited(archive.extractfile(member), max_member_size)
+            except Exception as e:
+                data, error = None, str(e)
+            yield member.name, data, error
+
+
+def iter_archive_members(fileobj, max_member_size=MAX_MEMBER_SIZE):
+    """
+    Open a zip or tar archive and return an iterator of (name, data, error)
+    for each file in it
+
+    Members are decompressed one at a time, straight from the upload stream,
+    and never written to disk. A member larger than max_member_size is
+    reported with an error instead of data, so its decompression stops at
+    the limit. ArchiveError is raised here, before any member is read, when
+    the upload is not an archive, and by the iterator when a tar archive
+    turns out to be corrupt partway through.
+
+    Parameters:
+    fileobj: Binary file object holding the archive; zip archives need it to be seekable
+    max_member_size (int): Largest member to decompress, in bytes
+    """
+    head = fileobj.read(4)
+    fileobj.seek(0)
+
+    if head in ZIP_MAGIC:
+        try:
+            return _iter_zip(zipfile.ZipFile(fileobj), max_member_size)
+        except zipfile.BadZipFile as e:
+            raise ArchiveError(f'Invalid zip archive: {e}')
+
+    try:
+        # Streaming mode reads members in order without seeking; compression is detected
+        return _iter_tar(tarfile.open(fileobj=fileobj, mode='r|*'), max_member_size)
+    except tarfile.TarError as e:
+        raise ArchiveError(f'Upload is not a zip or tar archive: {e}')
+
+
+def _analyze_member(document, job_description):
+    # Runs in a pool worker initialized with init_analysis_worker
+    if isinstance(document, bytes):
+        document = document.decode('utf-8')
+    return analyze_in_worker([document], job_description)[0]
+
+
+def analyze_members(members, job_description, executor, max_pending=8, extract=None):
+    """
+    Analyze archive members on a process pool and yield results as they finish
+
+    At most max_pending members are decompressed and waiting for a worker at
+    any time, so memory stays bounded however large the archive is. Errors
+    are reported per member and never stop the batch. An archive that is
+    corrupt partway through ends the results with an {"error"} record.
+    When a worker dies, the pool is broken for good: the members that were
+    in flight are reported and BrokenProcessPool is raised so the caller
+    can replace the pool.
+
+    Parameters:
+    members (iterable): (name, data, error) tuples from iter_archive_members
+    job_description (str): Optional job description applied to every member
+    executor (Executor): Pool whose workers were set up with init_analysis_worker
+    max_pending (int): Most members submitted but not yet reported
+    extract (callable): Optional function turning member bytes into text,
+    e.g. TextExtractor.extract; members are decoded as UTF-8 otherwise
+
+    Yields:
+    dict: {"filename", "analysis"}, {"filename", "error"} or, last, {"error"}
+    """
+    pending = {}
+
+    def drain():
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        broken = None
+        for future in done:
+            name = pending.pop(future)
+            try:
+                result = {'filename': name, 'analysis': future.result()}
+            except UnicodeDecodeError:
+                result = {'filename': name, 'error': 'Member is not UTF-8 text'}
+            except BrokenProcessPool as e:
+                result = {'filename': name, 'error': str(e)}
+                broken = e
+            except Exception as e:
+                result = {'filename': name, 'error': str(e)}
+            yield result
+        if broken is not None:
+            raise broken
+
+    try:
+        try:
+            for name, data, error in members:
+                if error is None and extract is not None:
+                    try:
+                        data = extract(data)
+                    except Exception as e:
+                        error = str(e)
+                if error is not None:
+                    yield {'filename': name, 'error': error}
+                    continue
+
+                pending[executor.submit(_analyze_member, data, job_description)] = name
+                if len(pending) >= max_pending:
+                    yield from drain()
+        except ArchiveError as e:
+            # Report the members read before the corruption, then the archive error
+            while pending:
+                yield from drain()
+            yield {'error': str(e)}
+            return
+
+        while pending:
+            yield from drain()
+    finally:
+        # The client went away mid-stream; drop work that has not started
+        for future in pending:
+            future.cancel()
+
+
+def to_ndjson(results):
+    """Serialize result dicts as newline-delimited JSON"""
+    for result in results:
+        yield json.dumps(result) + '\n'
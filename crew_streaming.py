@@ -0,0 +1,196 @@
+"""
+Stream a CrewAI crew's progress and final answer to a Streamlit page
+
+The crew runs on a background thread. Agent steps and finished tasks are
+reported as status messages, and the tokens each LLM call produces after
+"Final Answer:" are forwarded as they arrive. The first agent's draft
+therefore appears within seconds and is replaced by the final task's
+document as it is written, instead of the page staying empty for the
+whole crew.
+"""
+import queue
+import threading
+import time
+
+try:
+    from crewai import LLM
+    from crewai.utilities.events import crewai_event_bus, LLMCallStartedEvent, LLMStreamChunkEvent
+except ImportError:
+    # LLMStreamChunkEvent and LLM(stream=True) arrived in CrewAI 0.108.0; with
+    # older releases a run only reports status messages and the final document
+    crewai_event_bus = None
+
+FINAL_ANSWER_MARKER = 'Final Answer:'
+
+# Shortest interval between two re-renders of the streamed text, in seconds
+RENDER_INTERVAL = 0.05
+
+# Worker thread id -> CrewRun; LLM events are emitted on the thread making the call
+_active_runs = {}
+
+if crewai_event_bus is not None:
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _forward_call_start(source, event):
+        run = _active_runs.get(threading.get_ident())
+        if run is not None:
+            run._on_call_start()
+
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def _forward_chunk(source, event):
+        run = _active_runs.get(threading.get_ident())
+        if run is not None:
+            run._on_chunk(event.chunk)
+
+
+def streaming_llm(model):
+    """Return an LLM that streams its tokens, or the plain model name when streaming is unavailable"""
+    if crewai_event_bus is None:
+        return model
+    return LLM(model=model, stream=True)
+
+
+class CrewRun:
+    """
+    One crew execution on a background thread, observed through events()
+
+    Parameters:
+    build_crew (callable): Called as build_crew(llm, step_callback, task_callback)
+    on the worker thread; returns the Crew to run
+    inputs (dict): Inputs passed to crew.kickoff
+    model (str): Model name for the streaming LLM
+    """
+
+    def __init__(self, build_crew, inputs, model):
+        self.build_crew = build_crew
+        self.inputs = inputs
+        self.model = model
+        self._events = queue.Queue()
+        self._roles = []
+        self._tasks_done = 0
+        # Current LLM call: text before its answer, whether the answer has
+        # begun, and whether any of it was sent
+        self._pending = ''
+        self._answering = False
+        self._sent = False
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        _active_runs[threading.get_ident()] = self
+        try:
+            crew = self.build_crew(streaming_llm(self.model), self._on_step, self._on_task)
+            self._roles = [task.agent.role for task in crew.tasks]
+            self._status(f'{self._roles[0]} is drafting...')
+            result = crew.kickoff(inputs=self.inputs)
+            self._events.put(('done', result.raw))
+        except Exception as e:
+            self._events.put(('error', e))
+        finally:
+            del _active_runs[threading.get_ident()]
+
+    def _status(self, message):
+        self._events.put(('status', message))
+
+    def _on_step(self, step):
+        tool = getattr(step, 'tool', None)
+        if tool:
+            self._status(f'{self._current_role()} is using {tool}...')
+
+    def _on_task(self, output):
+        self._tasks_done += 1
+        if self._tasks_done < len(self._roles):
+            self._status(f'{output.agent} finished. {self._current_role()} is writing...')
+
+    def _current_role(self):
+        return self._roles[min(self._tasks_done, len(self._roles) - 1)] if self._roles else 'The crew'
+
+    def _on_call_start(self):
+        # Every call, including a delegated coworker's, writes a new answer
+        self._pending = ''
+        self._answering = False
+        if self._sent:
+            self._sent = False
+            self._events.put(('reset', None))
+
+    def _on_chunk(self, chunk):
+        if not chunk:
+            return
+        if not self._answering:
+            # Hold back the agent's reasoning until the answer begins
+            self._pending += chunk
+            marker = self._pending.find(FINAL_ANSWER_MARKER)
+            if marker == -1:
+                return
+            chunk = self._pending[marker + len(FINAL_ANSWER_MARKER):]
+            self._answering = True
+        if not self._sent:
+            # Drop the whitespace between the marker and the answer
+            chunk = chunk.lstrip()
+        if chunk:
+            self._sent = True
+            self._events.put(('token', chunk))
+
+    def events(self):
+        """
+        Yield (kind, value) events until the crew finishes
+
+        Kinds are 'status' (message), 'token' (answer text, consecutive
+        tokens merged), 'reset' (a new answer starts), 'done' (final
+        document) and 'error' (exception).
+        """
+        while True:
+            kind, value = self._events.get()
+            if kind == 'token':
+                # Merge tokens that are already waiting into one update
+                try:
+                    while True:
+                        next_kind, next_value = self._events.get_nowait()
+                        if next_kind != 'token':
+                            yield kind, value
+                            kind, value = next_kind, next_value
+                            break
+                        value += next_value
+                except queue.Empty:
+                    pass
+            yield kind, value
+            if kind in ('done', 'error'):
+                return
+
+
+def stream_to_page(run, status, output):
+    """
+    Render a CrewRun into Streamlit placeholders and return the final document
+
+    Parameters:
+    run (CrewRun): Started crew run
+    status: Placeholder for progress messages, e.g. st.empty()
+    output: Placeholder for the document, e.g. st.empty()
+
+    Returns:
+    str: The final document
+    """
+    streamed = ''
+    last_render = 0.0
+    for kind, value in run.events():
+        if kind == 'status':
+            status.info(value)
+        elif kind == 'reset':
+            # Keep showing the previous answer until the new one has text
+            streamed = ''
+        elif kind == 'token':
+            streamed += value
+            now = time.monotonic()
+            if now - last_render >= RENDER_INTERVAL:
+                output.markdown(streamed + '▌')
+                last_render = now
+        elif kind == 'error':
+            status.empty()
+            raise value
+        else:
+            status.empty()
+            output.markdown(value)
+            return value
@@ -0,0 +1,287 @@
+"""
+Compiled patterns and single-pass document features
+
+Every scan here does work linear in the document length, whatever the
+input. Patterns whose direct regex form can backtrack across long spans
+(digit runs, period-free text, email local parts) are evaluated by the
+scanners below, which return exactly what the regex would.
+"""
+import re
+import string
+
+# Contact information
+EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+EMAIL_DOMAIN_PATTERN = re.compile(r'[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+PHONE_PATTERN = re.compile(r'\b(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}\b')
+
+# Section headings and action verbs; suggestions only look at the leading subset
+SECTION_HEADINGS = ["education", "experience", "skills", "projects", "summary", "objective"]
+SUGGESTED_SECTION_HEADINGS = SECTION_HEADINGS[:4]
+ACTION_VERBS = ["achieved", "improved", "developed", "created", "implemented", "managed",
+                "led", "designed", "built", "launched", "increased", "decreased", "reduced"]
+SUGGESTED_ACTION_VERBS = ACTION_VERBS[:7]
+
+SECTION_PATTERNS = {heading: re.compile(r'\b' + re.escape(heading) + r'\b') for heading in SECTION_HEADINGS}
+ACTION_VERB_PATTERNS = {verb: re.compile(r'\b' + re.escape(verb) + r'\b') for verb in ACTION_VERBS}
+
+# Reference forms of the quantity and bullet patterns; count_quantifiable and
+# count_bullets give the same counts without backtracking through digit runs
+QUANTIFIABLE_PATTERN = re.compile(r'\b\d+%|\b\d+ percent|\$\d+|\d+ dollars|\d+ users|\d+ customers|\d+ projects|\d+ team')
+BULLET_PATTERN = re.compile(r'•|\*|-|\d+\.')
+DIGIT_RUN_PATTERN = re.compile(r'\d+')
+BOUNDED_QUANTITY_SUFFIXES = ('%', ' percent')
+QUANTITY_SUFFIXES = (' dollars', ' users', ' customers', ' projects', ' team')
+
+# Reference forms of the clause patterns; find_clauses returns the same
+# matches by splitting on periods instead of rescanning period-free spans
+EDUCATION_KEYWORDS = ["bachelor", "master", "phd", "degree", "university", "college", "school"]
+EXPERIENCE_KEYWORDS = ["experience", "work", "job", "position", "role"]
+EDUCATION_PATTERN = re.compile(r'(?i)(?:' + '|'.join(EDUCATION_KEYWORDS) + r')[^.]*\.')
+EXPERIENCE_PATTERN = re.compile(r'(?i)(?:' + '|'.join(EXPERIENCE_KEYWORDS) + r')[^.]*\.')
+EDUCATION_KEYWORD_PATTERN = re.compile(r'(?i)' + '|'.join(EDUCATION_KEYWORDS))
+EXPERIENCE_KEYWORD_PATTERN = re.compile(r'(?i)' + '|'.join(EXPERIENCE_KEYWORDS))
+
+
+def _is_word_char(ch):
+    # Same definition of a word character as the regex \b
+    return ch.isalnum() or ch == '_'
+
+
+def find_clauses(keyword_pattern, text):
+    """
+    Return each span from a keyword to the next period, like
+    findall(keyword + r'[^.]*\.') but linear in the length of the text
+
+    Parameters:
+    keyword_pattern (Pattern): Compiled alternation of keywords, none containing a period
+    text (str): Text to search
+
+    Returns:
+    list: Matched clauses, each ending with its period
+    """
+    clauses = []
+    # The text after the last period can never be followed by one
+    for segment in text.split('.')[:-1]:
+        match = keyword_pattern.search(segment)
+        if match:
+            clauses.append(segment[match.start():] + '.')
+    return clauses
+
+
+def count_clauses(keyword_pattern, text):
+    """Return len(find_clauses(keyword_pattern, text)) without building the clauses"""
+    count = 0
+    for segment in text.split('.')[:-1]:
+        if keyword_pattern.search(segment):
+            count += 1
+    return count
+
+
+def summarize_clauses(keyword_pattern, text):
+    """
+    Summarize the clauses of one paragraph so paragraphs can be counted
+    separately and combined with combine_clause_counts
+
+    A clause runs from a keyword to the next period and may continue across
+    paragraph breaks, so the text before the first period and after the last
+    one are kept apart from the complete segments in between.
+
+    Returns:
+    tuple: (lead, inner, trail) where lead tells whether the text before the
+    first period has a keyword (None when there is no period), inner counts
+    the complete segments with a keyword and trail tells whether the text
+    after the last period has one
+    """
+    segments = text.split('.')
+    trail = keyword_pattern.search(segments[-1]) is not None
+    if len(segments) == 1:
+        return None, 0, trail
+    lead = keyword_pattern.search(segments[0]) is not None
+    inner = sum(1 for segment in segments[1:-1] if keyword_pattern.search(segment))
+    return lead, inner, trail
+
+
+def combine_clause_counts(summaries):
+    """Return the clause count of consecutive paragraphs from their summarize_clauses results"""
+    count = 0
+    # Whether the segment still waiting for its period has a keyword
+    pending = False
+    for lead, inner, trail in summaries:
+        if lead is None:
+            pending = pending or trail
+        else:
+            count += (pending or lead) + inner
+            pending = trail
+    return count
+
+
+def count_quantifiable(text):
+    """Return len(QUANTIFIABLE_PATTERN.findall(text)) in a single pass over the digit runs"""
+    count = 0
+    for match in DIGIT_RUN_PATTERN.finditer(text):
+        start, end = match.span()
+        if start > 0 and text[start - 1] == '$':
+            count += 1
+        elif text.startswith(QUANTITY_SUFFIXES, end):
+            count += 1
+        elif text.startswith(BOUNDED_QUANTITY_SUFFIXES, end) and (start == 0 or not _is_word_char(text[start - 1])):
+            count += 1
+    return count
+
+
+def count_bullets(text):
+    """Return len(BULLET_PATTERN.findall(text)) in a single pass over the digit runs"""
+    count = text.count('•') + text.count('*') + text.count('-')
+    for match in DIGIT_RUN_PATTERN.finditer(text):
+        if text.startswith('.', match.end()):
+            count += 1
+    return count
+
+
+def has_email(text):
+    """Return whether EMAIL_PATTERN matches anywhere in text, in time linear in its length"""
+    at = text.find('@')
+    while at != -1:
+        # Walk back over the local part; runs before different @ signs never overlap
+        start = at
+        while start > 0 and text[start - 1] in EMAIL_LOCAL_CHARS:
+            start -= 1
+        # The local part must begin at a word boundary
+        local_ok = False
+        for i in range(start, at):
+            before = i > 0 and _is_word_char(text[i - 1])
+            if before != _is_word_char(text[i]):
+                local_ok = True
+                break
+        if local_ok and EMAIL_DOMAIN_PATTERN.match(text, at + 1):
+            return True
+        at = text.find('@', at + 1)
+    return False
+
+
+class DocumentFeatures:
+    """
+    Text features of a single document, extracted once and shared by every
+    scorer and suggestion generator of ResumeAnalyzer
+
+    Parameters:
+    text (str): The raw document text
+    skill_matcher (SkillMatcher): Compiled skills taxonomy
+    title_matcher (SkillMatcher): Compiled job title list
+    """
+
+    def __init__(self, text, skill_matcher, title_matcher):
+        self.text = text
+        self.lower = text.lower()
+
+        # Length and layout
+        self.word_count = len(text.split())
+        self.paragraph_count = len(text.split('\n\n'))
+        self.bullet_count = count_bullets(text)
+
+        # Contact information
+        self.has_email = has_email(text)
+        self.has_phone = PHONE_PATTERN.search(text) is not None
+
+        # Keyword hits
+        self.sections = {heading for heading, pattern in SECTION_PATTERNS.items() if pattern.search(self.lower)}
+        self.action_verbs = {verb for verb, pattern in ACTION_VERB_PATTERNS.items() if pattern.search(self.lower)}
+        self.quantifiable_count = count_quantifiable(self.lower)
+        self.education_count = count_clauses(EDUCATION_KEYWORD_PATTERN, text)
+        self.experience_count = count_clauses(EXPERIENCE_KEYWORD_PATTERN, text)
+
+        # Taxonomy hits
+        self.skills = skill_matcher.group(skill_matcher.match(self.lower))
+        self.skill_count = sum(len(skills_list) for skills_list in self.skills.values())
+        self.job_titles = set(title_matcher.group(title_matcher.match(self.lower))["titles"])
+
+    @classmethod
+    def from_paragraphs(cls, text, paragraphs, skill_matcher, title_matcher):
+        """
+        Combine per-paragraph features into the features of the whole document
+
+        The result is identical to DocumentFeatures(text, ...) when paragraphs
+        are the ParagraphFeatures of text.split('\\n\\n'), in order.
+
+        Parameters:
+        text (str): The raw document text
+        paragraphs (list): ParagraphFeatures of each paragraph
+        skill_matcher (SkillMatcher): Compiled skills taxonomy
+        title_matcher (SkillMatcher): Compiled job title list
+        """
+        features = cls.__new__(cls)
+        features.text = text
+        features.lower = '\n\n'.join(paragraph.lower for paragraph in paragraphs)
+
+        features.word_count = sum(paragraph.word_count for paragraph in paragraphs)
+        features.paragraph_count = len(paragraphs)
+        features.bullet_count = sum(paragraph.bullet_count for paragraph in paragraphs)
+
+        features.has_email = any(paragraph.has_email for paragraph in paragraphs)
+        features.has_phone = any(paragraph.has_phone for paragraph in paragraphs)
+
+        features.sections = set().union(*(paragraph.sections for paragraph in paragraphs))
+        features.action_verbs = set().union(*(paragraph.action_verbs for paragraph in paragraphs))
+        features.quantifiable_count = sum(paragraph.quantifiable_count for paragraph in paragraphs)
+        features.education_count = combine_clause_counts(paragraph.education for paragraph in paragraphs)
+        features.experience_count = combine_clause_counts(paragraph.experience for paragraph in paragraphs)
+
+        features.skills = skill_matcher.group(set().union(*(paragraph.skill_ids for paragraph in paragraphs)))
+        features.skill_count = sum(len(skills_list) for skills_list in features.skills.values())
+        title_ids = set().union(*(paragraph.title_ids for paragraph in paragraphs))
+        features.job_titles = set(title_matcher.group(title_ids)["titles"])
+        return features
+
+
+class ParagraphFeatures:
+    """
+    Feature contributions of one paragraph, a block of the document between
+    blank lines, which DocumentFeatures.from_paragraphs combines
+
+    No pattern can match across a paragraph break except the education and
+    experience clauses, which are kept as summarize_clauses summaries.
+
+    Parameters:
+    paragraph (str): The raw paragraph text
+    skill_matcher (SkillMatcher): Compiled skills taxonomy
+    title_matcher (SkillMatcher): Compiled job title list
+    """
+
+    def __init__(self, paragraph, skill_matcher, title_matcher):
+        self.lower = paragraph.lower()
+
+        self.word_count = len(paragraph.split())
+        self.bullet_count = count_bullets(paragraph)
+
+        self.has_email = has_email(paragraph)
+        self.has_phone = PHONE_PATTERN.search(paragraph) is not None
+
+        self.sections = {heading for heading, pattern in SECTION_PATTERNS.items() if pattern.search(self.lower)}
+        self.action_verbs = {verb for verb, pattern in ACTION_VERB_PATTERNS.items() if pattern.search(self.lower)}
+        self.quantifiable_count = count_quantifiable(self.lower)
+        self.education = summarize_clauses(EDUCATION_KEYWORD_PATTERN, paragraph)
+        self.experience = summarize_clauses(EXPERIENCE_KEYWORD_PATTERN, paragraph)
+
+        self.skill_ids = skill_matcher.match(self.lower)
+        self.title_ids = title_matcher.match(self.lower)
+
+
+class JobProfile:
+    """
+    Job description features compiled once and reused when scoring many
+    resumes against the same opening
+
+    Parameters:
+    text (str): The raw job description
+    skill_matcher (SkillMatcher): Compiled skills taxonomy
+    title_matcher (SkillMatcher): Compiled job title list
+    """
+
+    def __init__(self, text, skill_matcher, title_matcher):
+        self.text = text
+        lower = text.lower()
+        self.skills = skill_matcher.extract(lower)
+        self.skill_sets = {category: set(skills_list) for category, skills_list in self.skills.items()}
+        self.skill_count = sum(len(skills_list) for skills_list in self.skills.values())
+        self.job_titles = set(title_matcher.extract(lower)["titles"])
@@ -0,0 +1,175 @@
+"""
+On-disk cache of TF-IDF feature matrices for repeated training runs
+
+Tokenizing a corpus and fitting the vectorizer costs far more than fitting
+most classifiers on the result, so a hyperparameter sweep over the same
+corpus should pay for it once. Entries are keyed by a fingerprint of the
+documents and the vectorizer configuration, and hold the CSR arrays, the
+idf vector and the vocabulary. The arrays are stored as raw .npy files and
+memory-mapped read-only when loaded.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+from scipy import sparse
+
+from resume_tokenizer import ResumeTokenizer
+
+# Bump when the layout of a cache entry changes
+FEATURE_CACHE_FORMAT = 1
+
+MANIFEST_FILE = "manifest.json"
+VOCABULARY_FILE = "vocabulary.json"
+ARRAY_FILES = ("data", "indices", "indptr", "idf")
+
+
+def corpus_fingerprint(documents):
+    """Hash a list of documents, in order"""
+    digest = hashlib.sha256()
+    for document in documents:
+        data = document.encode("utf-8")
+        # Length prefixes keep ['ab', 'c'] and ['a', 'bc'] apart
+        digest.update(str(len(data)).encode("ascii") + b":" + data)
+    return digest.hexdigest()
+
+
+def _describe_tokenizer(tokenizer):
+    return {"stop_words": sorted(tokenizer.stop_words), "min_length": tokenizer.min_length}
+
+
+def vectorizer_config(vectorizer):
+    """
+    Describe everything about a vectorizer that affects its output
+
+    A ResumeTokenizer analyzer is described by its stopwords and minimum
+    token length; other callables by their qualified name only.
+    """
+    import sklearn
+
+    config = {"class": type(vectorizer).__name__, "sklearn": sklearn.__version__}
+    for name, value in sorted(vectorizer.get_params().items()):
+        if isinstance(value, ResumeTokenizer):
+            value = _describe_tokenizer(value)
+        elif callable(value):
+            value = getattr(value, "__module__", "") + "." + getattr(value, "__qualname__", type(value).__name__)
+        elif isinstance(value, (set, frozenset)):
+            value = sorted(value)
+        elif isinstance(value, type):
+            value = value.__name__
+        config[name] = value
+    return config
+
+
+class FeatureCache:
+    """
+    Directory of cached feature matrices, one subdirectory per entry
+
+    Parameters:
+    directory (str): Cache directory, created if needed
+    max_entries (int): Entries kept; the least recently used are removed first
+    mmap (bool): Memory-map the arrays when loading
+    """
+
+    def __init__(self, directory, max_entries=8, mmap=True):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.mmap = mmap
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, documents, vectorizer, tokenizer=None):
+        """
+        Key for a corpus vectorized with a given vectorizer configuration
+
+        Parameters:
+        documents (list): Document texts
+        vectorizer: Vectorizer the features are fitted with
+        tokenizer (ResumeTokenizer): Tokenizer applied to the documents before
+        the vectorizer sees them, if any; its stopwords change the features
+        even when the vectorizer's own analyzer is something else
+        """
+        config = vectorizer_config(vectorizer)
+        if tokenizer is not None:
+            config["tokenizer"] = _describe_tokenizer(tokenizer)
+        config = json.dumps(config, sort_keys=True, default=str)
+        return hashlib.sha256(
+            f"{FEATURE_CACHE_FORMAT}:{corpus_fingerprint(documents)}:{config}".encode("utf-8")
+        ).hexdigest()
+
+    def load(self, key, vectorizer):
+        """
+        Load a cached matrix and fit the vectorizer from the cached vocabulary
+
+        Parameters:
+        key (str): Entry key from key()
+        vectorizer: Unfitted vectorizer with the configuration the entry was made with
+
+        Returns:
+        scipy.sparse.csr_matrix: The feature matrix, or None on a miss
+        """
+        path = os.path.join(self.directory, key)
+        try:
+            with open(os.path.join(path, MANIFEST_FILE)) as f:
+                manifest = json.load(f)
+            if manifest.get("format") != FEATURE_CACHE_FORMAT:
+                return None
+            arrays = {
+                name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if self.mmap else None)
+                for name in ARRAY_FILES
+            }
+            with open(os.path.join(path, VOCABULARY_FILE)) as f:
+                terms = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        X = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(manifest["shape"]), copy=False
+        )
+        vectorizer.vocabulary_ = {term: index for index, term in enumerate(terms)}
+        vectorizer.fixed_vocabulary_ = False
+        vectorizer.idf_ = np.asarray(arrays["idf"])
+        # Mark the entry as recently used for pruning
+        os.utime(path)
+        return X
+
+    def save(self, key, X, vectorizer):
+        """Store a feature matrix and its fitted vectorizer's vocabulary and idf"""
+        X = sparse.csr_matrix(X)
+        terms = [None] * len(vectorizer.vocabulary_)
+        for term, index in vectorizer.vocabulary_.items():
+            terms[index] = term
+
+        # Assemble the entry next to its final location, then rename it into place
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            arrays = {"data": X.data, "indices": X.indices, "indptr": X.indptr, "idf": vectorizer.idf_}
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, name + ".npy"), np.ascontiguousarray(array))
+            with open(os.path.join(staging, VOCABULARY_FILE), "w") as f:
+                json.dump(terms, f)
+            with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+                json.dump({"format": FEATURE_CACHE_FORMAT, "shape": list(X.shape), "created": time.time()}, f)
+
+            path = os.path.join(self.directory, key)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.rename(staging, path)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._prune()
+
+    def _prune(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            entries.append((os.path.getmtime(path), path))
+        entries.sort(reverse=True)
+        for _, path in entries[self.max_entries:]:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,77 @@
+"""
+Persistent cache of generated documents for the Streamlit generator apps
+
+A generation is identified by its normalized form inputs, the agent and
+task prompts and the model, so resubmitting the same form returns the
+earlier document instantly without calling the model. Editing a prompt or
+switching models changes the key, so stale content is never served.
+
+Settings:
+    NEXUS_GENERATION_CACHE_DIR    Directory of the on-disk store
+    NEXUS_GENERATION_CACHE_TTL    Seconds a generation stays valid
+    NEXUS_GENERATION_CACHE_SIZE   Most generations kept on disk
+"""
+import json
+import os
+
+from result_cache import ResultCache
+
+# Model the crews run on; the same variables CrewAI reads by default
+CREW_MODEL = os.environ.get('MODEL') or os.environ.get('OPENAI_MODEL_NAME') or 'gpt-4o-mini'
+
+GENERATION_CACHE_DIR = os.environ.get('NEXUS_GENERATION_CACHE_DIR', '.generation_cache')
+GENERATION_CACHE_TTL = float(os.environ.get('NEXUS_GENERATION_CACHE_TTL', 7 * 24 * 3600))
+GENERATION_CACHE_SIZE = int(os.environ.get('NEXUS_GENERATION_CACHE_SIZE', 500))
+
+
+def normalize_inputs(inputs):
+    """Strip and collapse whitespace in form values so trivially different submissions share a key"""
+    return {name: ' '.join(str(value).split()) for name, value in inputs.items()}
+
+
+class GenerationCache:
+    """
+    Generated documents stored on disk, with TTL and size eviction
+
+    Parameters:
+    directory (str): Directory of the on-disk store
+    ttl (float): Seconds a generation stays valid, or None to never expire
+    max_entries (int): Most generations kept in memory and on disk
+    """
+
+    def __init__(self, directory=GENERATION_CACHE_DIR, ttl=GENERATION_CACHE_TTL, max_entries=GENERATION_CACHE_SIZE):
+        self._cache = ResultCache(max_entries=max_entries, ttl=ttl, directory=directory,
+                                  max_disk_entries=max_entries)
+
+    @staticmethod
+    def make_key(inputs, prompts, model=CREW_MODEL):
+        """
+        Key a generation
+
+        Inputs are normalized for the key only, so submissions that differ
+        in whitespace share an entry while the crew still gets them as typed.
+
+        Parameters:
+        inputs (dict): Form inputs
+        prompts (dict): Every agent and task prompt the crew is built from
+        model (str): Model name
+
+        Returns:
+        str: Cache key
+        """
+        return ResultCache.make_key(
+            json.dumps(normalize_inputs(inputs), sort_keys=True),
+            json.dumps(prompts, sort_keys=True),
+            model
+        )
+
+    def get(self, key):
+        """Return the cached document for a key, or None"""
+        value = self._cache.get(key)
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, key, text):
+        self._cache.set(key, text.encode('utf-8'))
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,137 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from document_features import DocumentFeatures, ParagraphFeatures
+from metrics import REGISTRY
+
+PARAGRAPHS_ANALYZED = REGISTRY.counter(
+    'nexus_incremental_paragraphs_total', 'Paragraphs seen by incremental analysis, by cache result',
+    labelnames=('result',)
+)
+
+
+class AnalysisSession:
+    """
+    Incremental analysis of one resume that is edited and re-analyzed repeatedly
+
+    The resume is split into paragraphs at blank lines. Features of each
+    paragraph are cached by its text, so after an edit only new or changed
+    paragraphs are scanned before the document features are recombined.
+    analyze() returns exactly what analyzer.analyze_resume would.
+
+    Parameters:
+    analyzer (ResumeAnalyzer): Analyzer providing the taxonomy and scorers
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self._version = analyzer.version
+        self._paragraphs = {}
+        self._job = (None, None)
+        self.last_reused = 0
+        self.last_computed = 0
+
+    def analyze(self, resume_text, job_description=None):
+        """
+        Analyze the latest version of the resume
+
+        Parameters:
+        resume_text (str): Full resume text
+        job_description (str): Optional job description to match against
+
+        Returns:
+        dict: The same analysis as ResumeAnalyzer.analyze_resume
+        """
+        analyzer = self.analyzer
+        analyzer.check_size(resume_text)
+        if analyzer.version != self._version:
+            # The taxonomy changed; cached paragraph features are stale
+            self._version = analyzer.version
+            self._paragraphs = {}
+            self._job = (None, None)
+
+        cached = self._paragraphs
+        current = {}
+        parts = []
+        reused = 0
+        for paragraph in resume_text.split('\n\n'):
+            part = current.get(paragraph) or cached.get(paragraph)
+            if part is None:
+                part = ParagraphFeatures(paragraph, analyzer.skill_matcher, analyzer.title_matcher)
+            else:
+                reused += 1
+            current[paragraph] = part
+            parts.append(part)
+
+        # Keep only paragraphs of the latest version so memory follows the document size
+        self._paragraphs = current
+        self.last_reused = reused
+        self.last_computed = len(parts) - reused
+        PARAGRAPHS_ANALYZED.inc('reused', amount=self.last_reused)
+        PARAGRAPHS_ANALYZED.inc('computed', amount=self.last_computed)
+
+        features = DocumentFeatures.from_paragraphs(resume_text, parts, analyzer.skill_matcher,
+                                                    analyzer.title_matcher)
+        return analyzer.analyze_resume(resume_text, self._job_profile(job_description), features=features)
+
+    def _job_profile(self, job_description):
+        # The job description rarely changes between edits, so its profile is kept
+        if not job_description:
+            return None
+        text, profile = self._job
+        if text != job_description:
+            profile = self.analyzer.compile_job_profile(job_description)
+            self._job = (job_description, profile)
+        return profile
+
+
+class SessionStore:
+    """
+    Bounded set of AnalysisSessions addressed by random session ids
+
+    Sessions idle for longer than ttl seconds expire, and the least recently
+    used session is dropped when more than max_sessions are open.
+
+    Parameters:
+    analyzer (ResumeAnalyzer): Analyzer shared by all sessions
+    max_sessions (int): Most sessions kept at once
+    ttl (float): Seconds a session may stay idle
+    """
+
+    def __init__(self, analyzer, max_sessions=1000, ttl=1800):
+        self.analyzer = analyzer
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id=None):
+        """
+        Return (session_id, session) for an open session, or a new session
+        when session_id is missing, unknown or expired
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None) if session_id else None
+            if entry is None or now - entry[1] > self.ttl:
+                session_id = secrets.token_urlsafe(16)
+                entry = (AnalysisSession(self.analyzer), now)
+            self._sessions[session_id] = (entry[0], now)
+
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            while self._sessions:
+                oldest_id, (_, last_used) = next(iter(self._sessions.items()))
+                if now - last_used <= self.ttl:
+                    break
+                del self._sessions[oldest_id]
+            return session_id, entry[0]
+
+    def close(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self):
+        return len(self._sessions)
@@ -0,0 +1,83 @@
+import heapq
+import itertools
+
+
+class JobIndex:
+    """
+    Inverted index of job descriptions for finding the best jobs for a resume
+
+    Every job description is reduced to its skills from the analyzer's
+    taxonomy and stored as posting lists keyed by (category, skill). A query
+    only walks the postings of the skills found in the resume, so its cost
+    depends on how many jobs share those skills rather than on the size of
+    the index. Scores use the same match percentage as
+    ResumeAnalyzer.calculate_skills_match_score.
+
+    Parameters:
+    analyzer (ResumeAnalyzer): Analyzer whose taxonomy is used for both sides
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self._postings = {}
+        # job id -> (insertion sequence, skill keys, total skill count)
+        self._jobs = {}
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def __contains__(self, job_id):
+        return job_id in self._jobs
+
+    def add(self, job_id, job_description):
+        """Index a job description, replacing any previous version with the same id"""
+        if job_id in self._jobs:
+            self.remove(job_id)
+
+        profile = self.analyzer.compile_job_profile(job_description)
+        keys = {(category, skill) for category, skills_list in profile.skills.items() for skill in skills_list}
+        for key in keys:
+            self._postings.setdefault(key, set()).add(job_id)
+        self._jobs[job_id] = (next(self._sequence), keys, profile.skill_count)
+
+    def remove(self, job_id):
+        """Drop a job description from the index"""
+        _, keys, _ = self._jobs.pop(job_id)
+        for key in keys:
+            postings = self._postings[key]
+            postings.discard(job_id)
+            if not postings:
+                del self._postings[key]
+
+    def query(self, resume_text, top_k=10, features=None):
+        """
+        Return the jobs that best match a resume
+
+        Parameters:
+        resume_text (str): The resume to match
+        top_k (int): Number of jobs to return
+        features (DocumentFeatures): Already extracted resume features, if any
+
+        Returns:
+        list: Dicts with the job id and skills match score, best first; jobs
+        sharing no skill with the resume are left out
+        """
+        if features is None:
+            features = self.analyzer.extract_features(resume_text)
+
+        # Count the resume skills each job also asks for
+        matching = {}
+        for category, skills_list in features.skills.items():
+            for skill in skills_list:
+                for job_id in self._postings.get((category, skill), ()):
+                    matching[job_id] = matching.get(job_id, 0) + 1
+
+        scored = []
+        for job_id, matching_skills in matching.items():
+            sequence, _, total_job_skills = self._jobs[job_id]
+            score = min((matching_skills / total_job_skills) * 100, 100)
+            scored.append((score, -sequence, job_id))
+
+        best = heapq.nlargest(top_k, scored, key=lambda entry: entry[:2])
+        return [{"jobId": job_id, "score": score} for score, _, job_id in best]
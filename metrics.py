@@ -0,0 +1,197 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format
+
+Metrics are kept per process. Set NEXUS_METRICS=0 to turn collection off
+entirely; recording then returns immediately and nothing is exposed.
+"""
+import bisect
+import os
+import threading
+import time
+
+# Latency buckets in seconds, from 100 microseconds to 10 seconds
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Document size buckets in bytes or characters, from 1KB to 10MB
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 10485760)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonically increasing count, optionally split by labels
+
+    Parameters:
+    registry (MetricsRegistry): Registry the counter belongs to
+    name (str): Metric name
+    help (str): Description shown in the exposition
+    labelnames (tuple): Label names; inc() takes one value per name
+    """
+
+    def __init__(self, registry, name, help, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for labelvalues, value in values:
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_number(value)}')
+        return lines
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets, optionally split by labels
+
+    Parameters:
+    registry (MetricsRegistry): Registry the histogram belongs to
+    name (str): Metric name
+    help (str): Description shown in the exposition
+    buckets (tuple): Sorted upper bounds; a +Inf bucket is always added
+    labelnames (tuple): Label names; observe() takes one value per name
+    """
+
+    def __init__(self, registry, name, help, buckets=LATENCY_BUCKETS, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        # Per label set: [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        if not self.registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labelvalues, (list(counts), total)) for labelvalues, (counts, total) in self._series.items())
+        for labelvalues, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_number(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}_sum{labels} {_format_number(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class StageTimer:
+    """
+    Records the time between consecutive marks into a histogram labelled by stage
+
+    Each mark() costs one clock read and one observation, so a request can
+    be split into stages without nesting timers.
+    """
+
+    def __init__(self, histogram, *labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+        self.start = self.last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.histogram.observe(now - self.last, *self.labelvalues, stage)
+        self.last = now
+
+    def total(self):
+        return time.perf_counter() - self.start
+
+
+class _NullTimer:
+    # Stand-in handed out when collection is disabled
+    def mark(self, stage):
+        pass
+
+    def total(self):
+        return 0.0
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """
+    Collection of counters and histograms exposed together
+
+    Parameters:
+    enabled (bool): Record observations; when False every metric is a no-op
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f'Metric already registered: {metric.name}')
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(self, name, help, labelnames))
+
+    def histogram(self, name, help, buckets=LATENCY_BUCKETS, labelnames=()):
+        return self._register(Histogram(self, name, help, buckets, labelnames))
+
+    def stage_timer(self, histogram, *labelvalues):
+        """Start a StageTimer, or a no-op timer when collection is disabled"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return StageTimer(histogram, *labelvalues)
+
+    def render(self):
+        """Return every metric in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registry shared by the analyzer and the web apps
+REGISTRY = MetricsRegistry(enabled=os.environ.get('NEXUS_METRICS', '1') != '0')
@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+# Bump when the layout of an artifact directory changes
+ARTIFACT_FORMAT = 1
+
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.joblib"
+CURRENT_FILE = "CURRENT"
+
+
+def save_artifact(directory, vectorizer, model, version=None):
+    """
+    Write a trained vectorizer and model as a versioned artifact
+
+    The estimators are dumped uncompressed with joblib so their numpy arrays
+    are stored raw and can be memory-mapped by load_artifact. The artifact is
+    assembled in a temporary directory and renamed into place, so readers
+    never see a partial version.
+
+    Parameters:
+    directory (str): Directory holding all versions
+    vectorizer: Fitted vectorizer
+    model: Fitted classifier
+    version (str): Version name, defaults to a timestamp
+
+    Returns:
+    str: The version that was written
+    """
+    import joblib
+
+    os.makedirs(directory, exist_ok=True)
+    if version is None:
+        version = time.strftime("%Y%m%d-%H%M%S")
+        suffix = 1
+        while os.path.exists(os.path.join(directory, version)):
+            version = time.strftime("%Y%m%d-%H%M%S") + "-" + str(suffix)
+            suffix += 1
+
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=directory)
+    joblib.dump({"vectorizer": vectorizer, "model": model}, os.path.join(staging, MODEL_FILE))
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "version": version,
+        "created": time.time(),
+        "vectorizer": type(vectorizer).__name__,
+        "model": type(model).__name__
+    }
+    with open(os.path.join(staging, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    os.rename(staging, os.path.join(directory, version))
+    return version
+
+
+def load_artifact(path, mmap=True):
+    """
+    Load a vectorizer and model written by save_artifact
+
+    With mmap enabled the numpy arrays held by the estimators (the idf
+    vector, class arrays and similar) are mapped read-only from the file, so
+    every process loading the same version shares those pages. Python
+    objects such as the vocabulary dict, and the node arrays that sklearn
+    copies into its own tree buffers, are still materialized per process.
+
+    Returns:
+    tuple: (vectorizer, model, manifest)
+    """
+    import joblib
+
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported model artifact format: {manifest.get('format')}")
+
+    data = joblib.load(os.path.join(path, MODEL_FILE), mmap_mode="r" if mmap else None)
+    return data["vectorizer"], data["model"], manifest
+
+
+class ModelRegistry:
+    """
+    Directory of versioned model artifacts with a CURRENT pointer
+
+    publish() writes a new version and moves the pointer atomically.
+    activate() and refresh() load the pointed-to version and hot-swap it into
+    a ResumeAnalyzer with ResumeAnalyzer.swap_model. Requests already running
+    keep using the model they started with, and nothing waits on a lock.
+
+    Parameters:
+    directory (str): Directory holding the versions and the CURRENT pointer
+    mmap (bool): Memory-map artifact arrays when loading
+    """
+
+    def __init__(self, directory, mmap=True):
+        self.directory = directory
+        self.mmap = mmap
+        self._lock = threading.Lock()
+
+    def publish(self, vectorizer, model, version=None):
+        """Save a new version and make it current"""
+        version = save_artifact(self.directory, vectorizer, model, version)
+        self.set_current(version)
+        return version
+
+    def set_current(self, version):
+        if not os.path.isdir(os.path.join(self.directory, version)):
+            raise ValueError(f"Unknown model version: {version}")
+        fd, tmp_path = tempfile.mkstemp(prefix=".current-", dir=self.directory)
+        with os.fdopen(fd, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.directory, CURRENT_FILE))
+
+    def current_version(self):
+        try:
+            with open(os.path.join(self.directory, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if not name.startswith(".") and os.path.isfile(os.path.join(self.directory, name, MANIFEST_FILE))
+        )
+
+    def activate(self, analyzer, version=None):
+        """Load a version, the current one by default, into an analyzer"""
+        version = version or self.current_version()
+        if version is None:
+            raise ValueError("No current model version has been published")
+        vectorizer, model, _ = load_artifact(os.path.join(self.directory, version), self.mmap)
+        analyzer.swap_model(vectorizer, model, version)
+        return version
+
+    def refresh(self, analyzer):
+        """Activate the current version if the analyzer is not already on it"""
+        with self._lock:
+            version = self.current_version()
+            if version is None or version == analyzer.model_version:
+                return False
+            self.activate(analyzer, version)
+            return True
+
+    def watch(self, analyzer, interval=30.0):
+        """
+        Refresh the analyzer now and then every interval seconds in a
+        background thread
+
+        Returns:
+        threading.Event: Set it to stop watching
+        """
+        stop = threading.Event()
+        self.refresh(analyzer)
+
+        def poll():
+            while not stop.wait(interval):
+                try:
+                    self.refresh(analyzer)
+                except Exception:
+                    # Keep serving the active model if a new version fails to load
+                    continue
+
+        threading.Thread(target=poll, name="model-registry-watch", daemon=True).start()
+        return stop
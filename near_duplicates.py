@@ -0,0 +1,242 @@
+"""
+Near-duplicate resume detection with MinHash signatures and an LSH index
+
+A resume is reduced to the set of word shingles of its tokenized text,
+and that set to a short MinHash signature whose matching positions estimate
+the Jaccard similarity of two resumes. Signatures are split into bands and
+every band is hashed into an index, so a lookup only compares the resumes
+that share at least one band instead of the whole corpus.
+
+The index is an SQLite database, in memory or in a file. Each resume is
+stored as its signature and one row per band: a million resumes take about
+1.2 GB of RAM in memory, or about 1 GB of disk in a file, where memory use
+stays at SQLite's page cache however large the index grows.
+"""
+import contextlib
+import hashlib
+import sqlite3
+import threading
+from array import array
+
+from resume_tokenizer import ResumeTokenizer
+
+# Mixes the distance into values borrowed from a neighbouring bin
+_BORROW_STEP = 0x9E3779B1
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS documents (slot INTEGER PRIMARY KEY, key TEXT NOT NULL, signature BLOB NOT NULL)",
+    # Clustered on the band hash, so finding candidates is one index seek per band
+    "CREATE TABLE IF NOT EXISTS bands (band_key INTEGER NOT NULL, slot INTEGER NOT NULL, "
+    "PRIMARY KEY (band_key, slot)) WITHOUT ROWID",
+)
+
+
+class NearDuplicateIndex:
+    """
+    Incremental index that finds earlier resumes nearly identical to a new one
+
+    Signatures use one permutation hashing: each shingle is hashed once and
+    the hash picks both the signature position and the value competing for
+    its minimum, so computing a signature costs one hash per shingle rather
+    than one per shingle and position. Empty positions borrow from the next
+    filled one. Inserting a resume costs one B-tree insert per band, which
+    stays under a millisecond at a million indexed resumes on disk.
+
+    A file index survives restarts and can be shared by the worker
+    processes of one server; an index built with other signature settings
+    is cleared when opened.
+
+    Parameters:
+    threshold (float): Estimated Jaccard similarity at which resumes count as duplicates
+    num_perm (int): Signature length
+    bands (int): Number of LSH bands; num_perm must be a multiple of it
+    shingle_size (int): Words per shingle
+    path (str): SQLite file holding the index, or None to keep it in memory
+    max_entries (int): Most resumes kept, oldest removed first, or None for no limit
+    tokenizer (callable): Splits a resume into words; a ResumeTokenizer
+    without stopwords by default, which needs no NLTK data
+    """
+
+    def __init__(self, threshold=0.85, num_perm=128, bands=16, shingle_size=5, path=None, max_entries=None,
+                 tokenizer=None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        if bands > 65535:
+            raise ValueError("bands must be at most 65535")
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+        self.tokenizer = tokenizer if tokenizer is not None else ResumeTokenizer()
+        self._lock = threading.Lock()
+        # Autocommit mode; transactions are opened explicitly in _transaction()
+        self._db = sqlite3.connect(path or ":memory:", timeout=30, isolation_level=None, check_same_thread=False)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._open()
+
+    def _open(self):
+        settings = {"num_perm": self.num_perm, "bands": self.bands, "shingle_size": self.shingle_size}
+        with self._transaction() as db:
+            for statement in _SCHEMA:
+                db.execute(statement)
+            stored = dict(db.execute("SELECT name, value FROM settings"))
+            if stored != settings:
+                # Signatures made with other settings cannot be compared with new ones
+                db.execute("DELETE FROM documents")
+                db.execute("DELETE FROM bands")
+                db.execute("DELETE FROM settings")
+                db.executemany("INSERT INTO settings VALUES (?, ?)", settings.items())
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # The thread lock serializes this process's threads on the connection;
+        # BEGIN IMMEDIATE serializes writers across processes sharing a file
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def signature(self, text):
+        """Return the MinHash signature of a resume, or None when it has no words"""
+        words = self.tokenizer(text)
+        if not words:
+            return None
+        size = min(self.shingle_size, len(words))
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+        num_perm = self.num_perm
+        bins = [None] * num_perm
+        for shingle in shingles:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little")
+            position = value % num_perm
+            value = (value // num_perm) & 0xFFFFFFFF
+            if bins[position] is None or value < bins[position]:
+                bins[position] = value
+
+        # Fill empty positions from the next filled one, wrapping around
+        signature = array("I", [0]) * num_perm
+        for position in range(num_perm):
+            distance = 0
+            while bins[(position + distance) % num_perm] is None:
+                distance += 1
+            value = bins[(position + distance) % num_perm]
+            signature[position] = (value + distance * _BORROW_STEP) & 0xFFFFFFFF
+        return signature
+
+    def _band_keys(self, signature):
+        # Stable across processes, unlike hash(), so a file index can be shared and reopened
+        data = signature.tobytes()
+        width = len(data) // self.bands
+        return [
+            int.from_bytes(
+                hashlib.blake2b(band.to_bytes(2, "little") + data[band * width:(band + 1) * width],
+                                digest_size=8).digest(),
+                "little", signed=True
+            )
+            for band in range(self.bands)
+        ]
+
+    def _query(self, db, signature, band_keys):
+        placeholders = ",".join("?" * len(band_keys))
+        rows = db.execute(
+            "SELECT key, signature FROM documents WHERE slot IN "
+            f"(SELECT slot FROM bands WHERE band_key IN ({placeholders})) ORDER BY slot",
+            band_keys
+        )
+
+        # Verify candidates on the full signature; ties go to the earliest document
+        num_perm = self.num_perm
+        best = None
+        for key, data in rows:
+            stored = array("I")
+            stored.frombytes(data)
+            similarity = sum(a == b for a, b in zip(signature, stored)) / num_perm
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def _add(self, db, key, signature, band_keys):
+        slot = db.execute("INSERT INTO documents (key, signature) VALUES (?, ?)",
+                          (key, signature.tobytes())).lastrowid
+        db.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?)", [(band_key, slot) for band_key in band_keys])
+
+        if self.max_entries is not None:
+            # Slots only grow and the oldest are removed first, so the ones to evict are the lowest
+            evicted = db.execute("SELECT slot, signature FROM documents WHERE slot <= ?",
+                                 (slot - self.max_entries,)).fetchall()
+            for old_slot, data in evicted:
+                old_signature = array("I")
+                old_signature.frombytes(data)
+                db.executemany("DELETE FROM bands WHERE band_key = ? AND slot = ?",
+                               [(band_key, old_slot) for band_key in self._band_keys(old_signature)])
+                db.execute("DELETE FROM documents WHERE slot = ?", (old_slot,))
+
+    def query(self, signature, key=None):
+        """
+        Find the earlier resume most similar to a signature
+
+        Parameters:
+        signature (array): Signature from signature()
+        key (str): The resume's own key; a match with it is not reported
+
+        Returns:
+        tuple: (key, estimated similarity) of the best match at or above the
+        threshold, or None
+        """
+        if signature is None:
+            return None
+        band_keys = self._band_keys(signature)
+        with self._lock:
+            match = self._query(self._db, signature, band_keys)
+        if match is not None and key is not None and match[0] == key:
+            return None
+        return match
+
+    def add(self, key, signature):
+        """Index a resume signature under a key, e.g. a digest of the upload"""
+        if signature is None:
+            return
+        band_keys = self._band_keys(signature)
+        with self._transaction() as db:
+            self._add(db, key, signature, band_keys)
+
+    def find_or_add(self, key, signature):
+        """
+        Return the earlier near-duplicate of a resume, indexing the resume when there is none
+
+        Only the first resume of a group of near-duplicates is indexed, so
+        the index fills with distinct resumes. A match with the resume's own
+        key is not reported.
+
+        Returns:
+        tuple: (key, estimated similarity) of the earlier resume, or None
+        """
+        if signature is None:
+            return None
+        band_keys = self._band_keys(signature)
+        with self._transaction() as db:
+            match = self._query(db, signature, band_keys)
+            if match is None:
+                self._add(db, key, signature, band_keys)
+            elif match[0] == key:
+                return None
+            return match
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    Content-addressed cache of serialized results
+
+    Values are stored as bytes so a cached response is byte-identical to the
+    one that was computed. Entries live in an in-memory LRU bounded by
+    max_entries and expire after ttl seconds. When a directory is given,
+    entries are also written there so they survive restarts. The directory
+    is pruned to max_disk_entries, oldest first.
+
+    Parameters:
+    max_entries (int): Maximum number of entries kept in memory
+    ttl (float): Seconds an entry stays valid, or None to never expire
+    directory (str): Optional directory for the on-disk tier
+    max_disk_entries (int): Maximum number of entries kept on disk
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, directory=None, max_disk_entries=10000):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        """Hash the parts into a cache key; parts may be bytes, str or None"""
+        digest = hashlib.sha256()
+        for part in parts:
+            if part is None:
+                digest.update(b'N')
+                continue
+            if isinstance(part, str):
+                tag, part = b'S', part.encode('utf-8')
+            else:
+                tag = b'B'
+            # Length prefixes keep ('ab', 'c') and ('a', 'bc') apart
+            digest.update(tag + str(len(part)).encode('ascii') + b':' + part)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Return the cached bytes for a key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value, expires_at = self._read_disk(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store(key, value, expires_at)
+            return value
+
+    def set(self, key, value):
+        """Cache bytes under a key"""
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._store(key, value, expires_at)
+        self._write_disk(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+    def _store(self, key, value, expires_at):
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _read_disk(self, key, now):
+        if not self.directory:
+            return None, None
+        path = self._path(key)
+        try:
+            written_at = os.path.getmtime(path)
+            if self.ttl is not None and written_at + self.ttl <= now:
+                os.remove(path)
+                return None, None
+            with open(path, 'rb') as f:
+                value = f.read()
+        except OSError:
+            return None, None
+        return value, written_at + self.ttl if self.ttl is not None else None
+
+    def _write_disk(self, key, value):
+        if not self.directory:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._disk_writes += 1
+        if self._disk_writes >= max(1, self.max_disk_entries // 10):
+            self._disk_writes = 0
+            self._prune_disk()
+
+    def _prune_disk(self):
+        now = time.time()
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                # Skip temporary files of writes still in progress
+                if name.startswith('tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+
+        files.sort()
+        excess = len(files) - self.max_disk_entries
+        for index, (written_at, path) in enumerate(files):
+            expired = self.ttl is not None and written_at + self.ttl <= now
+            if index < excess or expired:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
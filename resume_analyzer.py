@@ -1,30 +1,190 @@
-import pandas as pd
-import numpy as np
-import re
-import nltk
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, classification_report
 import pickle
 import json
+import hashlib
+import heapq
+import math
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from skill_matcher import SkillMatcher
+from taxonomy import Taxonomy, load_taxonomy
+from resume_tokenizer import ResumeTokenizer
+from metrics import REGISTRY, SIZE_BUCKETS
+from document_features import (
+    DocumentFeatures, JobProfile, EDUCATION_KEYWORD_PATTERN, EXPERIENCE_KEYWORD_PATTERN,
+    SUGGESTED_SECTION_HEADINGS, SUGGESTED_ACTION_VERBS, find_clauses
+)
 
-# Download NLTK resources
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('wordnet')
+# NLTK data is resolved from local directories only and never downloaded at
+# runtime; run fetch_nltk_data() once at build time to bundle it
+NLTK_RESOURCES = ["stopwords"]
+NLTK_DATA_DIR = os.environ.get('NEXUS_NLTK_DATA') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+
+def _import_nltk():
+    # nltk is only needed for training, so it is imported on first use
+    import nltk
+    if NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+    return nltk
+
+def fetch_nltk_data(directory=NLTK_DATA_DIR):
+    """Download the NLTK resources used for training into a local directory"""
+    nltk = _import_nltk()
+    for resource in NLTK_RESOURCES:
+        nltk.download(resource, download_dir=directory, quiet=True)
+
+# Bump whenever a change to the scoring logic alters analysis results
+ANALYZER_VERSION = "1"
+
+# Per-process analysis metrics, exposed by the web apps
+ANALYSIS_SECONDS = REGISTRY.histogram(
+    'nexus_analysis_seconds', 'Time spent in ResumeAnalyzer.analyze_resume'
+)
+ANALYSIS_STAGE_SECONDS = REGISTRY.histogram(
+    'nexus_analysis_stage_seconds', 'Time spent in each stage of ResumeAnalyzer.analyze_resume',
+    labelnames=('stage',)
+)
+ANALYSIS_DOCUMENT_CHARACTERS = REGISTRY.histogram(
+    'nexus_analysis_document_characters', 'Length of analyzed resumes in characters', buckets=SIZE_BUCKETS
+)
+ANALYSIS_ERRORS = REGISTRY.counter(
+    'nexus_analysis_errors_total', 'Analyses that raised an exception', labelnames=('error',)
+)
+
+# Longest resume or job description accepted, in characters; feature
+# extraction is linear, so this bounds the work done for any single request
+MAX_DOCUMENT_CHARS = int(os.environ.get('NEXUS_MAX_DOCUMENT_CHARS', 500_000))
+
+# Optional skills and job title taxonomy file replacing the built-in lists
+TAXONOMY_PATH = os.environ.get('NEXUS_TAXONOMY') or None
+
+class InputTooLargeError(ValueError):
+    """Raised when a document exceeds the analyzer's size limit"""
+
+# Corpora smaller than this are tokenized in-process during training
+PARALLEL_TOKENIZE_THRESHOLD = 2000
+
+# Guards replacement of ResumeAnalyzer._trained; module-level so analyzers stay picklable
+_trained_lock = threading.Lock()
+
+# Analyzer held by each worker process of a process pool running analyses
+_worker_analyzer = None
+
+def init_analysis_worker(analyzer):
+    """Process pool initializer that installs a preinitialized analyzer in the worker"""
+    global _worker_analyzer
+    _worker_analyzer = analyzer
+
+def analyze_in_worker(resumes, job_description=None):
+    """Analyze a chunk of resumes with the analyzer installed by init_analysis_worker"""
+    return [_worker_analyzer.analyze_resume(resume_text, job_description) for resume_text in resumes]
 
 class ResumeAnalyzer:
-    def __init__(self):
-        self.stop_words = set(stopwords.words('english'))
-        self.vectorizer = TfidfVectorizer(max_features=5000)
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.skills_keywords = self._load_skills_keywords()
-        self.job_titles = self._load_job_titles()
-        
+    def __init__(self, max_document_chars=MAX_DOCUMENT_CHARS, taxonomy_path=TAXONOMY_PATH):
+        self.max_document_chars = max_document_chars
+        # Training-only resources are created on first use to keep startup fast
+        self._stop_words = None
+        self._tokenizer = None
+        # (vectorizer, model, version) replaced as a whole so a model swap is atomic
+        self._trained = (None, None, None)
+        if taxonomy_path:
+            # Loaded from its compiled index unless the file changed
+            self.taxonomy = load_taxonomy(taxonomy_path)
+        else:
+            self.taxonomy = self._builtin_taxonomy()
+        self.version = self._fingerprint()
+    
+    @property
+    def skills_keywords(self):
+        return self.taxonomy.skills_keywords
+    
+    @property
+    def job_titles(self):
+        return self.taxonomy.job_titles
+    
+    @property
+    def skill_matcher(self):
+        return self.taxonomy.skill_matcher
+    
+    @property
+    def title_matcher(self):
+        return self.taxonomy.title_matcher
+        
+    @property
+    def stop_words(self):
+        if self._stop_words is None:
+            _import_nltk()
+            from nltk.corpus import stopwords
+            self._stop_words = set(stopwords.words('english'))
+        return self._stop_words
+    
+    @stop_words.setter
+    def stop_words(self, value):
+        self._stop_words = value
+    
+    @property
+    def tokenizer(self):
+        if self._tokenizer is None:
+            self._tokenizer = ResumeTokenizer(self.stop_words)
+        return self._tokenizer
+    
+    def _default_component(self, position, build):
+        # Fill an empty vectorizer or model slot of _trained with a default.
+        # The tuple is replaced only if it is still the one that was read, so
+        # a concurrent swap_model() is never overwritten.
+        default = None
+        while True:
+            trained = self._trained
+            if trained[position] is not None:
+                return trained[position]
+            if default is None:
+                default = build()
+            with _trained_lock:
+                if self._trained is trained:
+                    self._trained = trained[:position] + (default,) + trained[position + 1:]
+                    return default
+    
+    @property
+    def vectorizer(self):
+        def build():
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            # The tokenizer is the analyzer so each document is tokenized exactly once
+            return TfidfVectorizer(max_features=5000, analyzer=self.tokenizer)
+        return self._default_component(0, build)
+    
+    @vectorizer.setter
+    def vectorizer(self, value):
+        with _trained_lock:
+            self._trained = (value, self._trained[1], None)
+    
+    @property
+    def model(self):
+        def build():
+            from sklearn.ensemble import RandomForestClassifier
+            return RandomForestClassifier(n_estimators=100, random_state=42)
+        return self._default_component(1, build)
+    
+    @model.setter
+    def model(self, value):
+        with _trained_lock:
+            self._trained = (self._trained[0], value, None)
+    
+    @property
+    def model_version(self):
+        return self._trained[2]
+    
+    def swap_model(self, vectorizer, model, version=None):
+        """Atomically replace the trained vectorizer and model, e.g. under live traffic"""
+        with _trained_lock:
+            self._trained = (vectorizer, model, version)
+    
+    def trained_model(self):
+        """Return a consistent (vectorizer, model) pair for one inference call"""
+        vectorizer, model, _ = self._trained
+        return vectorizer, model
+    
     def _load_skills_keywords(self):
-        # In a real implementation, this would load from a comprehensive database
+        # Built-in taxonomy, used when no NEXUS_TAXONOMY file is configured
         return {
             "technical": [
                 "python", "javascript", "react", "node.js", "typescript", "html", "css", 
@@ -47,7 +207,7 @@ class ResumeAnalyzer:
         }
     
     def _load_job_titles(self):
-        # In a real implementation, this would load from a comprehensive database
+        # Built-in taxonomy, used when no NEXUS_TAXONOMY file is configured
         return [
             "software engineer", "data scientist", "web developer", "frontend developer",
             "backend developer", "full stack developer", "devops engineer", "cloud engineer",
@@ -56,65 +216,103 @@ class ResumeAnalyzer:
             "systems administrator", "network engineer", "security engineer", "database administrator"
         ]
     
+    def _builtin_taxonomy(self):
+        skills_keywords = self._load_skills_keywords()
+        job_titles = self._load_job_titles()
+        source = json.dumps([skills_keywords, job_titles], sort_keys=True)
+        return Taxonomy(
+            skills_keywords, job_titles, SkillMatcher(skills_keywords), SkillMatcher({"titles": job_titles}),
+            hashlib.sha256(source.encode('utf-8')).hexdigest()
+        )
+    
+    def _fingerprint(self):
+        # Identifies the scoring logic and taxonomy, e.g. for keying cached results
+        return ANALYZER_VERSION + "-" + self.taxonomy.fingerprint[:16]
+    
     def preprocess_text(self, text):
-        # Convert to lowercase
-        text = text.lower()
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        # Tokenize
-        tokens = nltk.word_tokenize(text)
-        # Remove stopwords
-        tokens = [word for word in tokens if word not in self.stop_words]
+        # Lowercase, strip non-letters, split and remove stopwords in one pass
+        tokens = self.tokenizer(text)
         # Join tokens back to string
         return ' '.join(tokens)
     
-    def extract_skills(self, text):
-        text = text.lower()
-        found_skills = {
-            "technical": [],
-            "soft": [],
-            "business": []
-        }
+    def tokenize_corpus(self, documents, n_jobs=None):
+        """
+        Tokenize a corpus, in parallel across processes when it is large
         
-        for category, skills in self.skills_keywords.items():
-            for skill in skills:
-                if re.search(r'\b' + re.escape(skill) + r'\b', text):
-                    found_skills[category].append(skill)
+        Parameters:
+        documents (list): Document texts
+        n_jobs (int): Number of worker processes, defaults to the CPU count
         
-        return found_skills
+        Returns:
+        list: One list of tokens per document
+        """
+        tokenizer = self.tokenizer
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs == 1 or len(documents) < PARALLEL_TOKENIZE_THRESHOLD:
+            return [tokenizer(document) for document in documents]
+        
+        chunksize = max(1, math.ceil(len(documents) / (n_jobs * 4)))
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            return list(executor.map(tokenizer, documents, chunksize=chunksize))
+    
+    def extract_skills(self, text):
+        # All categories are matched in a single pass over the text
+        return self.skill_matcher.extract(text)
     
     def extract_education(self, text):
-        education_keywords = ["bachelor", "master", "phd", "degree", "university", "college", "school"]
-        education_pattern = r'(?i)(?:' + '|'.join(education_keywords) + r')[^.]*\.'
-        education_matches = re.findall(education_pattern, text)
+        self.check_size(text)
+        education_matches = find_clauses(EDUCATION_KEYWORD_PATTERN, text)
         return education_matches
     
     def extract_experience(self, text):
-        experience_keywords = ["experience", "work", "job", "position", "role"]
-        experience_pattern = r'(?i)(?:' + '|'.join(experience_keywords) + r')[^.]*\.'
-        experience_matches = re.findall(experience_pattern, text)
+        self.check_size(text)
+        experience_matches = find_clauses(EXPERIENCE_KEYWORD_PATTERN, text)
         return experience_matches
     
-    def calculate_ats_score(self, resume_text, job_description=None):
+    def check_size(self, text):
+        """Raise InputTooLargeError if text is longer than max_document_chars"""
+        if len(text) > self.max_document_chars:
+            raise InputTooLargeError(
+                f"Document has {len(text)} characters; the limit is {self.max_document_chars}"
+            )
+    
+    def extract_features(self, text):
+        """Extract the features shared by all scorers from a document in one pass"""
+        self.check_size(text)
+        return DocumentFeatures(text, self.skill_matcher, self.title_matcher)
+    
+    def compile_job_profile(self, job_description):
+        """Compile a job description once so it can be scored against many resumes"""
+        self.check_size(job_description)
+        return JobProfile(job_description, self.skill_matcher, self.title_matcher)
+    
+    def _job_profile(self, job_description):
+        # Accept either raw job description text or an already compiled profile
+        if isinstance(job_description, JobProfile):
+            return job_description if job_description.text else None
+        if job_description:
+            return self.compile_job_profile(job_description)
+        return None
+    
+    def calculate_ats_score(self, resume_text, job_description=None, features=None):
+        if features is None:
+            features = self.extract_features(resume_text)
+        
         # Basic ATS compatibility score
         ats_score = 0
         
         # Check for contact information
-        if re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text):
+        if features.has_email:
             ats_score += 10  # Email found
         
-        if re.search(r'\b(?:\+\d{1,3}[-.\s]?)?$$?\d{3}$$?[-.\s]?\d{3}[-.\s]?\d{4}\b', resume_text):
+        if features.has_phone:
             ats_score += 10  # Phone number found
         
         # Check for section headings
-        section_headings = ["education", "experience", "skills", "projects", "summary", "objective"]
-        for heading in section_headings:
-            if re.search(r'\b' + heading + r'\b', resume_text.lower()):
-                ats_score += 5
+        ats_score += 5 * len(features.sections)
         
         # Check for skills
-        skills = self.extract_skills(resume_text)
-        total_skills = sum(len(skills_list) for skills_list in skills.values())
+        total_skills = features.skill_count
         if total_skills > 15:
             ats_score += 20
         elif total_skills > 10:
@@ -125,26 +323,25 @@ class ResumeAnalyzer:
             ats_score += 5
         
         # Check for job title match if job description is provided
-        if job_description:
-            for title in self.job_titles:
-                if re.search(r'\b' + re.escape(title) + r'\b', resume_text.lower()) and \
-                   re.search(r'\b' + re.escape(title) + r'\b', job_description.lower()):
-                    ats_score += 15
-                    break
+        profile = self._job_profile(job_description)
+        if profile:
+            if features.job_titles & profile.job_titles:
+                ats_score += 15
         
         # Normalize score to 0-100
         ats_score = min(ats_score, 100)
         
         return ats_score
     
-    def calculate_content_quality_score(self, resume_text):
+    def calculate_content_quality_score(self, resume_text, features=None):
+        if features is None:
+            features = self.extract_features(resume_text)
+        
         # Basic content quality score
         quality_score = 0
         
         # Check for action verbs
-        action_verbs = ["achieved", "improved", "developed", "created", "implemented", "managed", 
-                        "led", "designed", "built", "launched", "increased", "decreased", "reduced"]
-        action_verb_count = sum(1 for verb in action_verbs if re.search(r'\b' + re.escape(verb) + r'\b', resume_text.lower()))
+        action_verb_count = len(features.action_verbs)
         
         if action_verb_count > 10:
             quality_score += 25
@@ -154,8 +351,7 @@ class ResumeAnalyzer:
             quality_score += 5
         
         # Check for quantifiable achievements
-        quantifiable_pattern = r'\b\d+%|\b\d+ percent|\$\d+|\d+ dollars|\d+ users|\d+ customers|\d+ projects|\d+ team'
-        quantifiable_count = len(re.findall(quantifiable_pattern, resume_text.lower()))
+        quantifiable_count = features.quantifiable_count
         
         if quantifiable_count > 5:
             quality_score += 25
@@ -165,15 +361,13 @@ class ResumeAnalyzer:
             quality_score += 5
         
         # Check for education details
-        education = self.extract_education(resume_text)
-        if len(education) > 0:
+        if features.education_count > 0:
             quality_score += 15
         
         # Check for experience details
-        experience = self.extract_experience(resume_text)
-        if len(experience) > 3:
+        if features.experience_count > 3:
             quality_score += 25
-        elif len(experience) > 1:
+        elif features.experience_count > 1:
             quality_score += 15
         else:
             quality_score += 5
@@ -183,13 +377,15 @@ class ResumeAnalyzer:
         
         return quality_score
     
-    def calculate_format_score(self, resume_text):
+    def calculate_format_score(self, resume_text, features=None):
+        if features is None:
+            features = self.extract_features(resume_text)
+        
         # Basic format score
         format_score = 0
         
         # Check for section headings
-        section_headings = ["education", "experience", "skills", "projects", "summary", "objective"]
-        section_count = sum(1 for heading in section_headings if re.search(r'\b' + re.escape(heading) + r'\b', resume_text.lower()))
+        section_count = len(features.sections)
         
         if section_count >= 4:
             format_score += 30
@@ -199,8 +395,7 @@ class ResumeAnalyzer:
             format_score += 5
         
         # Check for bullet points
-        bullet_pattern = r'•|\*|-|\d+\.'
-        bullet_count = len(re.findall(bullet_pattern, resume_text))
+        bullet_count = features.bullet_count
         
         if bullet_count > 10:
             format_score += 30
@@ -210,16 +405,15 @@ class ResumeAnalyzer:
             format_score += 5
         
         # Check for consistent formatting
-        paragraphs = resume_text.split('\n\n')
-        if len(paragraphs) > 5:
+        if features.paragraph_count > 5:
             format_score += 20
-        elif len(paragraphs) > 3:
+        elif features.paragraph_count > 3:
             format_score += 10
         else:
             format_score += 5
         
         # Check for appropriate length
-        word_count = len(resume_text.split())
+        word_count = features.word_count
         if 300 <= word_count <= 700:
             format_score += 20
         elif word_count < 300:
@@ -232,15 +426,19 @@ class ResumeAnalyzer:
         
         return format_score
     
-    def calculate_skills_match_score(self, resume_text, job_description=None):
-        # Extract skills from resume
-        resume_skills = self.extract_skills(resume_text)
-        total_resume_skills = sum(len(skills_list) for skills_list in resume_skills.values())
-        
-        if job_description:
-            # Extract skills from job description
-            job_skills = self.extract_skills(job_description)
-            total_job_skills = sum(len(skills_list) for skills_list in job_skills.values())
+    def calculate_skills_match_score(self, resume_text, job_description=None, features=None):
+        if features is None:
+            features = self.extract_features(resume_text)
+        
+        # Skills found in the resume
+        resume_skills = features.skills
+        total_resume_skills = features.skill_count
+        
+        profile = self._job_profile(job_description)
+        if profile:
+            # Skills required by the job description
+            job_skills = profile.skill_sets
+            total_job_skills = profile.skill_count
             
             # Count matching skills
             matching_skills = 0
@@ -270,12 +468,34 @@ class ResumeAnalyzer:
         
         return skills_score
     
-    def analyze_resume(self, resume_text, job_description=None):
+    def analyze_resume(self, resume_text, job_description=None, features=None):
+        timer = REGISTRY.stage_timer(ANALYSIS_STAGE_SECONDS)
+        try:
+            analysis = self._analyze_resume(resume_text, job_description, timer, features)
+        except Exception as e:
+            ANALYSIS_ERRORS.inc(type(e).__name__)
+            raise
+        ANALYSIS_SECONDS.observe(timer.total())
+        ANALYSIS_DOCUMENT_CHARACTERS.observe(len(resume_text))
+        return analysis
+    
+    def _analyze_resume(self, resume_text, job_description, timer, features):
+        # Extract the document and job description features once for all scorers
+        if features is None:
+            features = self.extract_features(resume_text)
+        timer.mark('features')
+        job_description = self._job_profile(job_description)
+        timer.mark('job_profile')
+        
         # Calculate individual scores
-        ats_score = self.calculate_ats_score(resume_text, job_description)
-        content_score = self.calculate_content_quality_score(resume_text)
-        format_score = self.calculate_format_score(resume_text)
-        skills_score = self.calculate_skills_match_score(resume_text, job_description)
+        ats_score = self.calculate_ats_score(resume_text, job_description, features=features)
+        timer.mark('ats_score')
+        content_score = self.calculate_content_quality_score(resume_text, features=features)
+        timer.mark('content_score')
+        format_score = self.calculate_format_score(resume_text, features=features)
+        timer.mark('format_score')
+        skills_score = self.calculate_skills_match_score(resume_text, job_description, features=features)
+        timer.mark('skills_score')
         
         # Calculate overall score (weighted average)
         overall_score = int((ats_score * 0.3) + (content_score * 0.3) + (format_score * 0.2) + (skills_score * 0.2))
@@ -285,12 +505,11 @@ class ResumeAnalyzer:
         content_feedback = self._generate_content_feedback(content_score)
         format_feedback = self._generate_format_feedback(format_score)
         skills_feedback = self._generate_skills_feedback(skills_score)
+        timer.mark('feedback')
         
         # Generate suggestions
-        suggestions = self._generate_suggestions(resume_text, ats_score, content_score, format_score, skills_score)
-        
-        # Extract skills
-        skills = self.extract_skills(resume_text)
+        suggestions = self._generate_suggestions(resume_text, ats_score, content_score, format_score, skills_score, features=features)
+        timer.mark('suggestions')
         
         # Return analysis results
         return {
@@ -312,9 +531,128 @@ class ResumeAnalyzer:
                 "feedback": skills_feedback
             },
             "suggestions": suggestions,
-            "skills": skills
+            "skills": features.skills
         }
     
+    def analyze_batch(self, resumes, job_description=None, workers=None, chunksize=None, progress=None):
+        """
+        Analyze many resumes in parallel across a process pool
+        
+        Parameters:
+        resumes (iterable): Resume texts
+        job_description (str): Optional job description applied to every resume
+        workers (int): Number of worker processes, defaults to the CPU count
+        chunksize (int): Resumes per task, defaults to about four tasks per worker
+        progress (callable): Called as progress(completed, total) after each chunk
+        
+        Returns:
+        list: analyze_resume results in the same order as the input
+        """
+        resumes = list(resumes)
+        total = len(resumes)
+        job_description = self._job_profile(job_description)
+        workers = workers or os.cpu_count() or 1
+        if chunksize is None:
+            chunksize = max(1, math.ceil(total / (workers * 4)))
+        
+        chunks = [resumes[start:start + chunksize] for start in range(0, total, chunksize)]
+        results = [None] * len(chunks)
+        completed = 0
+        
+        # Small batches are not worth the cost of starting worker processes
+        if workers == 1 or len(chunks) <= 1:
+            for index, chunk in enumerate(chunks):
+                results[index] = [self.analyze_resume(resume_text, job_description) for resume_text in chunk]
+                completed += len(chunk)
+                if progress:
+                    progress(completed, total)
+            return [analysis for chunk_results in results for analysis in chunk_results]
+        
+        # Each worker receives a copy of this analyzer once, not one per task
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)), initializer=init_analysis_worker,
+                                 initargs=(self,)) as executor:
+            futures = {
+                executor.submit(analyze_in_worker, chunk, job_description): index
+                for index, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                completed += len(chunks[index])
+                if progress:
+                    progress(completed, total)
+        
+        return [analysis for chunk_results in results for analysis in chunk_results]
+    
+    def rank_candidates(self, job_description, resumes, top_k=10):
+        """
+        Score many resumes against one job description and keep the best ones
+        
+        Parameters:
+        job_description (str): The job description, compiled once for all resumes
+        resumes (iterable): Resume texts, consumed one at a time
+        top_k (int): Number of candidates to return; ValueError if less than 1
+        
+        Returns:
+        list: Dicts with the input index, overall score and full analysis,
+        best first; ties keep input order
+        """
+        if top_k < 1:
+            raise ValueError("top_k must be at least 1")
+        
+        profile = self._job_profile(job_description)
+        
+        # Bounded min-heap of (score, -index, analysis) so memory stays O(top_k)
+        heap = []
+        for index, resume_text in enumerate(resumes):
+            analysis = self.analyze_resume(resume_text, profile)
+            entry = (analysis["score"], -index, analysis)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        
+        ranked = sorted(heap, key=lambda entry: entry[:2], reverse=True)
+        return [
+            {"index": -negative_index, "score": score, "analysis": analysis}
+            for score, negative_index, analysis in ranked
+        ]
+    
+    def predict_category(self, texts, top_k=3):
+        """
+        Predict job categories for a batch of resumes with the trained model
+        
+        The whole batch is vectorized into one sparse matrix and scored with a
+        single predict_proba call.
+        
+        Parameters:
+        texts (list): Resume texts
+        top_k (int): Number of categories returned per resume
+        
+        Returns:
+        list: For each resume, a list of {"category", "probability"} dicts,
+        most likely first
+        """
+        vectorizer, model = self.trained_model()
+        if vectorizer is None or not hasattr(model, "classes_"):
+            raise RuntimeError("No trained model is loaded")
+        
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        probabilities = model.predict_proba(vectorizer.transform(texts))
+        classes = model.classes_
+        
+        predictions = []
+        for row in probabilities:
+            best = row.argsort()[::-1][:top_k]
+            predictions.append([
+                {"category": str(classes[index]), "probability": float(row[index])}
+                for index in best
+            ])
+        return predictions
+    
     def _generate_ats_feedback(self, score):
         if score >= 80:
             return "Your resume is highly compatible with ATS systems. It contains all the necessary elements for successful parsing."
@@ -347,59 +685,52 @@ class ResumeAnalyzer:
         else:
             return "Consider adding more relevant skills to your resume to better match job requirements."
     
-    def _generate_suggestions(self, resume_text, ats_score, content_score, format_score, skills_score):
+    def _generate_suggestions(self, resume_text, ats_score, content_score, format_score, skills_score, features=None):
+        if features is None:
+            features = self.extract_features(resume_text)
+        
         suggestions = []
         
         # ATS suggestions
         if ats_score < 80:
-            if not re.search(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', resume_text):
+            if not features.has_email:
                 suggestions.append("Add your email address to improve contact information.")
             
-            if not re.search(r'\b(?:\+\d{1,3}[-.\s]?)?$$?\d{3}$$?[-.\s]?\d{3}[-.\s]?\d{4}\b', resume_text):
+            if not features.has_phone:
                 suggestions.append("Add your phone number to improve contact information.")
             
-            section_headings = ["education", "experience", "skills", "projects"]
-            missing_sections = [heading for heading in section_headings if not re.search(r'\b' + re.escape(heading) + r'\b', resume_text.lower())]
+            missing_sections = [heading for heading in SUGGESTED_SECTION_HEADINGS if heading not in features.sections]
             if missing_sections:
                 suggestions.append(f"Add standard section headings for: {', '.join(missing_sections)}.")
         
         # Content suggestions
         if content_score < 80:
-            action_verbs = ["achieved", "improved", "developed", "created", "implemented", "managed", "led"]
-            action_verb_count = sum(1 for verb in action_verbs if re.search(r'\b' + re.escape(verb) + r'\b', resume_text.lower()))
+            action_verb_count = sum(1 for verb in SUGGESTED_ACTION_VERBS if verb in features.action_verbs)
             if action_verb_count < 5:
                 suggestions.append("Use more action verbs like 'achieved', 'improved', 'developed', etc.")
             
-            quantifiable_pattern = r'\b\d+%|\b\d+ percent|\$\d+|\d+ dollars|\d+ users|\d+ customers|\d+ projects|\d+ team'
-            quantifiable_count = len(re.findall(quantifiable_pattern, resume_text.lower()))
-            if quantifiable_count < 3:
+            if features.quantifiable_count < 3:
                 suggestions.append("Add metrics to your achievements (e.g., 'Increased sales by 20%' instead of 'Increased sales').")
         
         # Format suggestions
         if format_score < 80:
-            bullet_pattern = r'•|\*|-|\d+\.'
-            bullet_count = len(re.findall(bullet_pattern, resume_text))
-            if bullet_count < 5:
+            if features.bullet_count < 5:
                 suggestions.append("Use bullet points to highlight your achievements and responsibilities.")
             
-            paragraphs = resume_text.split('\n\n')
-            if len(paragraphs) < 4:
+            if features.paragraph_count < 4:
                 suggestions.append("Improve the structure of your resume with clear section breaks.")
             
-            word_count = len(resume_text.split())
-            if word_count > 700:
+            if features.word_count > 700:
                 suggestions.append("Your resume is too long. Consider shortening it to 1-2 pages for better readability.")
-            elif word_count < 300:
+            elif features.word_count < 300:
                 suggestions.append("Your resume may be too short. Consider adding more details about your experience and skills.")
         
         # Skills suggestions
         if skills_score < 80:
-            skills = self.extract_skills(resume_text)
-            total_skills = sum(len(skills_list) for skills_list in skills.values())
-            if total_skills < 10:
+            if features.skill_count < 10:
                 suggestions.append("Add more relevant skills to your resume, especially technical and industry-specific ones.")
             
-            if len(skills["soft"]) < 3:
+            if len(features.skills.get("soft", ())) < 3:
                 suggestions.append("Include more soft skills like communication, teamwork, and problem-solving.")
         
         # General suggestions
@@ -408,19 +739,39 @@ class ResumeAnalyzer:
         
         return suggestions[:7]  # Limit to 7 suggestions
     
-    def train_model(self, resumes_data, labels):
+    def train_model(self, resumes_data, labels, n_jobs=None, feature_cache=None):
         """
         Train the model on resume data
         
         Parameters:
         resumes_data (list): List of resume texts
         labels (list): List of corresponding labels (e.g., job categories)
+        n_jobs (int): Worker processes used to tokenize the corpus
+        feature_cache (FeatureCache): Optional cache of vectorized corpora; on
+        a hit the corpus is neither tokenized nor is the vectorizer refitted
         """
-        # Preprocess the resume texts
-        processed_resumes = [self.preprocess_text(resume) for resume in resumes_data]
-        
-        # Create feature vectors
-        X = self.vectorizer.fit_transform(processed_resumes)
+        from sklearn.model_selection import train_test_split
+        from sklearn.metrics import accuracy_score, classification_report
+        
+        resumes_data = list(resumes_data)
+        X = None
+        if feature_cache is not None:
+            # The corpus goes through self.tokenizer on every path, including
+            # vectorizers from older models that get the tokens as strings
+            cache_key = feature_cache.key(resumes_data, self.vectorizer, self.tokenizer)
+            X = feature_cache.load(cache_key, self.vectorizer)
+        
+        if X is None:
+            # Tokenize the resume texts once; the vectorizer consumes the tokens directly
+            processed_resumes = self.tokenize_corpus(resumes_data, n_jobs)
+            if not isinstance(self.vectorizer.analyzer, ResumeTokenizer):
+                # Vectorizers loaded from older models expect preprocessed strings
+                processed_resumes = [' '.join(tokens) for tokens in processed_resumes]
+            
+            # Create feature vectors
+            X = self.vectorizer.fit_transform(processed_resumes)
+            if feature_cache is not None:
+                feature_cache.save(cache_key, X, self.vectorizer)
         
         # Split the data
         X_train, X_test, y_train, y_test = train_test_split(X, labels, test_size=0.2, random_state=42)
@@ -438,6 +789,69 @@ class ResumeAnalyzer:
             "report": report
         }
     
+    def train_streaming(self, chunks, classes, update=False, n_features=2 ** 20):
+        """
+        Train the model incrementally from chunks of resumes, e.g. a corpus larger than memory
+        
+        Features come from a HashingVectorizer, which needs no fitted
+        vocabulary, and the classifier is an SGDClassifier with logistic
+        loss trained with partial_fit, so only one chunk is in memory at a
+        time. Each chunk is scored before the model learns from it, which
+        gives a progressive accuracy without holding out a test set. The
+        trained model is swapped in when all chunks are done.
+        
+        Parameters:
+        chunks (iterable): (texts, labels) pairs, e.g. from training_corpus.iter_chunks
+        classes (list): Every label the model can predict
+        update (bool): Continue training the current incrementally trained
+        model with new batches instead of starting over
+        n_features (int): Size of the hashed feature space of a new model
+        
+        Returns:
+        dict: Progressive accuracy and the number of documents and chunks trained on
+        """
+        import copy
+        from sklearn.feature_extraction.text import HashingVectorizer
+        from sklearn.linear_model import SGDClassifier
+        
+        if update:
+            vectorizer, model = self.trained_model()
+            if not isinstance(vectorizer, HashingVectorizer) or not hasattr(model, "partial_fit") \
+                    or not hasattr(model, "classes_"):
+                raise ValueError("The current model was not trained incrementally and cannot be updated")
+            unknown = set(classes) - set(model.classes_)
+            if unknown:
+                raise ValueError(f"Labels unknown to the current model: {sorted(unknown)}")
+            # Train a copy so requests keep using the current model until the swap
+            model = copy.deepcopy(model)
+            classes = model.classes_
+        else:
+            vectorizer = HashingVectorizer(n_features=n_features, analyzer=self.tokenizer, alternate_sign=False)
+            model = SGDClassifier(loss="log_loss", random_state=42)
+        
+        correct = 0
+        scored = 0
+        documents = 0
+        chunk_count = 0
+        for texts, labels in chunks:
+            X = vectorizer.transform(texts)
+            if hasattr(model, "classes_"):
+                correct += sum(predicted == label for predicted, label in zip(model.predict(X), labels))
+                scored += len(labels)
+            model.partial_fit(X, labels, classes=classes)
+            documents += len(texts)
+            chunk_count += 1
+        
+        if not documents:
+            raise ValueError("No training documents")
+        self.swap_model(vectorizer, model)
+        
+        return {
+            "accuracy": correct / scored if scored else None,
+            "documents": documents,
+            "chunks": chunk_count
+        }
+    
     def save_model(self, filepath):
         """Save the trained model to a file"""
         model_data = {
@@ -452,8 +866,7 @@ class ResumeAnalyzer:
         with open(filepath, 'rb') as f:
             model_data = pickle.load(f)
         
-        self.vectorizer = model_data["vectorizer"]
-        self.model = model_data["model"]
+        self.swap_model(model_data["vectorizer"], model_data["model"])
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,33 @@
+import re
+
+NON_LETTER_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+
+class ResumeTokenizer:
+    """
+    Fast tokenizer used for preprocessing and as the TfidfVectorizer analyzer
+
+    Lowercases the text, drops everything that is not an ASCII letter or
+    whitespace, splits on whitespace and removes stopwords and tokens shorter
+    than min_length. Documents that are already lists of tokens are returned
+    unchanged, so a corpus tokenized up front is not tokenized again by the
+    vectorizer.
+
+    Parameters:
+    stop_words (iterable): Words to drop
+    min_length (int): Shortest token to keep; 2 matches the default
+    TfidfVectorizer token pattern
+    """
+
+    def __init__(self, stop_words=(), min_length=2):
+        self.stop_words = frozenset(stop_words)
+        self.min_length = min_length
+
+    def __call__(self, document):
+        if isinstance(document, list):
+            return document
+
+        text = NON_LETTER_PATTERN.sub('', document.lower())
+        stop_words = self.stop_words
+        min_length = self.min_length
+        return [token for token in text.split() if len(token) >= min_length and token not in stop_words]
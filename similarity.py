@@ -0,0 +1,155 @@
+"""
+Many-to-many similarity between resumes and job descriptions
+
+Scores every resume of a hiring round against every job description with
+sparse matrix products instead of pairwise analyzer calls. Both sides are
+vectorized once; the score matrix is then computed a block of resumes at a
+time, so memory depends on block_size and the number of job descriptions
+rather than on the number of resumes.
+"""
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class SimilarityEngine:
+    """
+    Blend TF-IDF cosine similarity with the skills match score for many pairs
+
+    The TF-IDF side uses the analyzer's trained vectorizer. The skills side
+    reproduces ResumeAnalyzer.calculate_skills_match_score exactly: resumes
+    and job descriptions become binary term matrices over the skills
+    taxonomy, and their product counts the shared skills of every pair.
+
+    Parameters:
+    analyzer (ResumeAnalyzer): Analyzer with a trained vectorizer and the skills taxonomy;
+    a hashing vectorizer from streaming training works too
+    skill_weight (float): Share of the blended score taken by the skills match, 0 to 1
+    block_size (int): Resumes scored per block
+    """
+
+    def __init__(self, analyzer, skill_weight=0.5, block_size=1024):
+        if not 0 <= skill_weight <= 1:
+            raise ValueError("skill_weight must be between 0 and 1")
+        self.analyzer = analyzer
+        self.skill_weight = skill_weight
+        self.block_size = block_size
+
+    def _tfidf(self, texts):
+        vectorizer, _ = self.analyzer.trained_model()
+        # A hashing vectorizer from streaming training needs no fitting
+        if not (hasattr(vectorizer, "vocabulary_") or isinstance(vectorizer, HashingVectorizer)):
+            raise RuntimeError("No trained model is loaded")
+        # Rows are L2-normalized so a dot product is the cosine similarity
+        return normalize(sparse.csr_matrix(vectorizer.transform(texts), dtype=np.float64))
+
+    def _skills(self, texts, weighted):
+        # One column per taxonomy term. A term listed under several categories
+        # counts once per category, like the per-category comparison of the
+        # skills scorer, so job description columns carry that count.
+        matcher = self.analyzer.skill_matcher
+        weights = [len(entries) for entries in matcher.term_entries]
+        indptr = [0]
+        indices = []
+        data = []
+        for text in texts:
+            term_ids = sorted(matcher.match(text.lower()))
+            indices.extend(term_ids)
+            if weighted:
+                data.extend(weights[term_id] for term_id in term_ids)
+            else:
+                data.extend([1.0] * len(term_ids))
+            indptr.append(len(indices))
+        return sparse.csr_matrix((np.asarray(data, dtype=np.float64), indices, indptr),
+                                 shape=(len(texts), len(weights)))
+
+    def vectorize(self, texts, job_descriptions=False):
+        """
+        Vectorize documents for scoring
+
+        Parameters:
+        texts (list): Document texts
+        job_descriptions (bool): True when the documents are job descriptions
+
+        Returns:
+        tuple: (tfidf, skills) sparse matrices with one row per document
+        """
+        texts = list(texts)
+        for text in texts:
+            self.analyzer.check_size(text)
+        return self._tfidf(texts), self._skills(texts, weighted=job_descriptions)
+
+    def iter_blocks(self, resumes, job_descriptions):
+        """
+        Score every resume against every job description, a block of resumes at a time
+
+        Parameters:
+        resumes (list): Resume texts
+        job_descriptions (list): Job description texts
+
+        Returns:
+        iterator: (start, blended, similarity, skills_match) per block, where
+        the dense arrays have one row per resume from start on and one column
+        per job description, all on a 0-100 scale
+        """
+        resume_tfidf, resume_skills = self.vectorize(resumes)
+        job_tfidf, job_skills = self.vectorize(job_descriptions, job_descriptions=True)
+
+        # Transposed once so each block is a single sparse product per side
+        job_tfidf = job_tfidf.T.tocsc()
+        job_totals = np.asarray(job_skills.sum(axis=1)).ravel()
+        job_skills = job_skills.T.tocsc()
+        has_skills = job_totals > 0
+
+        for start in range(0, resume_tfidf.shape[0], self.block_size):
+            stop = start + self.block_size
+            similarity = (resume_tfidf[start:stop] @ job_tfidf).toarray() * 100
+            matching = (resume_skills[start:stop] @ job_skills).toarray()
+
+            # Job descriptions without any known skill score 0, as in the skills scorer
+            skills_match = np.zeros_like(matching)
+            np.divide(matching * 100, job_totals, out=skills_match, where=has_skills)
+            np.minimum(skills_match, 100, out=skills_match)
+
+            blended = (1 - self.skill_weight) * similarity + self.skill_weight * skills_match
+            yield start, blended, similarity, skills_match
+
+    def top_matches(self, resumes, job_descriptions, top_k=10):
+        """
+        Return the best job descriptions for every resume
+
+        Parameters:
+        resumes (list): Resume texts
+        job_descriptions (list): Job description texts
+        top_k (int): Number of job descriptions kept per resume
+
+        Returns:
+        list: For each resume, a list of {"index", "score", "similarity",
+        "skillsMatch"} dicts, best first; index points into job_descriptions
+        """
+        job_descriptions = list(job_descriptions)
+        k = min(top_k, len(job_descriptions))
+        matches = []
+        for _, blended, similarity, skills_match in self.iter_blocks(resumes, job_descriptions):
+            if k == 0:
+                matches.extend([] for _ in range(blended.shape[0]))
+                continue
+
+            best = np.argpartition(-blended, k - 1, axis=1)[:, :k]
+            best_scores = np.take_along_axis(blended, best, axis=1)
+            # Highest score first, lower index first among equal scores
+            order = np.lexsort((best, -best_scores), axis=1)
+            best = np.take_along_axis(best, order, axis=1)
+
+            for row, columns in enumerate(best):
+                matches.append([
+                    {
+                        "index": int(column),
+                        "score": float(blended[row, column]),
+                        "similarity": float(similarity[row, column]),
+                        "skillsMatch": float(skills_match[row, column])
+                    }
+                    for column in columns
+                ])
+        return matches
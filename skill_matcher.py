@@ -0,0 +1,279 @@
+from array import array
+from collections import deque
+
+# Marks unused slots of the double-array transition table
+FREE = -1
+
+
+def _is_word_char(ch):
+    # Mirrors the definition of \w used by the re module for str patterns
+    return ch.isalnum() or ch == '_'
+
+
+class SkillMatcher:
+    """
+    Find every keyword of a categorized taxonomy in a single pass over a text
+
+    The keywords are compiled once into an Aho-Corasick automaton. A keyword
+    counts as found when it occurs with the same word boundaries that
+    re.search(r'\\b' + re.escape(keyword) + r'\\b', text) would require, so the
+    results are identical to searching for each keyword separately while the
+    cost stays linear in the length of the text regardless of taxonomy size.
+
+    Aliases are matched like keywords but reported under the name of the
+    keyword they stand for.
+
+    Parameters:
+    keywords (dict): Mapping of category name to a list of keywords
+    aliases (dict): Optional mapping of alias to the keyword it stands for
+    """
+
+    def __init__(self, keywords, aliases=None):
+        self.categories = list(keywords)
+        # One entry per distinct term: the (category, position) pairs it belongs to
+        self.terms = []
+        self.term_entries = []
+        self._term_ids = {}
+
+        # Trie transitions and outputs while building; compacted afterwards
+        self._goto = [{}]
+        self._outputs = {}
+
+        for category, terms in keywords.items():
+            for position, term in enumerate(terms):
+                term = term.lower()
+                if not term:
+                    continue
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    term_id = self._add_term(term)
+                self.term_entries[term_id].append((category, position))
+
+        for alias, term in (aliases or {}).items():
+            alias = alias.lower()
+            term_id = self._term_ids.get(term.lower())
+            if term_id is None:
+                raise ValueError(f"Alias {alias!r} refers to unknown keyword {term!r}")
+            # A keyword that is also listed as an alias keeps its own name
+            if alias and alias not in self._term_ids:
+                self._add_pattern(alias, term_id)
+
+        self._build_failure_links()
+
+    def _add_term(self, term):
+        term_id = len(self.terms)
+        self._term_ids[term] = term_id
+        self.terms.append(term)
+        self.term_entries.append([])
+        self._add_pattern(term, term_id)
+        return term_id
+
+    def _add_pattern(self, pattern, term_id):
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._goto[state][ch] = next_state
+            state = next_state
+
+        # Boundary flags for the first and last character decide whether a
+        # \b assertion can hold on either side of a match
+        entry = (len(pattern), _is_word_char(pattern[0]), _is_word_char(pattern[-1]), term_id)
+        self._outputs.setdefault(state, []).append(entry)
+
+    def _build_failure_links(self):
+        goto = self._goto
+        fail = [0] * len(goto)
+        # For every state, the nearest state on its failure chain (itself
+        # included) that completes a pattern
+        report = {state: state for state in self._outputs}
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in goto[state].items():
+                queue.append(next_state)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(ch, 0)
+                fail[next_state] = target if target != next_state else 0
+                if next_state not in report and fail[next_state] in report:
+                    report[next_state] = report[fail[next_state]]
+
+        self._compact(goto, fail, report)
+
+    def _compact(self, goto, fail, report):
+        # Lay the trie out as a double array: the child of the state at
+        # position p for character code c sits at base[p] + c and is valid when
+        # check[base[p] + c] == p. Integer lists load from bytes in a few
+        # milliseconds, unlike a dict per state.
+        alphabet = sorted({ch for transitions in goto for ch in transitions})
+        self._alphabet = {ch: code for code, ch in enumerate(alphabet, 1)}
+        codes = self._alphabet
+
+        position = [0] * len(goto)
+        base = [0]
+        check = [FREE - 1]
+        # Free slots form a doubly linked list in position order; slot 0 holds
+        # the root, which is never free, so it doubles as the list head
+        next_free = [0]
+        prev_free = [0]
+
+        def grow(size):
+            while len(check) < size:
+                slot = len(check)
+                check.append(FREE)
+                base.append(0)
+                next_free.append(0)
+                prev_free.append(prev_free[0])
+                next_free[prev_free[0]] = slot
+                prev_free[0] = slot
+
+        queue = deque([0])
+        while queue:
+            state = queue.popleft()
+            children = sorted((codes[ch], next_state) for ch, next_state in goto[state].items())
+            if not children:
+                continue
+
+            # Try offsets that put the first child on a free slot until every child fits
+            first_code = children[0][0]
+            last_code = children[-1][0]
+            slot = next_free[0]
+            while True:
+                if slot == 0:
+                    slot = len(check)
+                    grow(slot + last_code + 1)
+                offset = slot - first_code
+                if offset >= 0:
+                    grow(offset + last_code + 1)
+                    if all(check[offset + code] == FREE for code, _ in children):
+                        break
+                slot = next_free[slot]
+
+            parent = position[state]
+            base[parent] = offset
+            for code, next_state in children:
+                taken = offset + code
+                next_free[prev_free[taken]] = next_free[taken]
+                prev_free[next_free[taken]] = prev_free[taken]
+                position[next_state] = taken
+                check[taken] = parent
+                queue.append(next_state)
+
+        # Pad so base[p] + code never runs past the end
+        padding = len(alphabet) + 1
+        base.extend([0] * padding)
+        check.extend([FREE] * padding)
+
+        self._base = base
+        self._check = check
+        self._fail = [0] * len(check)
+        self._report = [FREE] * len(check)
+        for state, slot in enumerate(position):
+            self._fail[slot] = position[fail[state]]
+            if state in report:
+                self._report[slot] = position[report[state]]
+        self._outputs = {position[state]: tuple(entries) for state, entries in self._outputs.items()}
+        del self._goto
+
+    def to_index(self):
+        """Return the compiled automaton as plain values and byte buffers, e.g. for marshal"""
+        return {
+            "categories": self.categories,
+            "terms": self.terms,
+            "term_entries": self.term_entries,
+            "alphabet": "".join(sorted(self._alphabet, key=self._alphabet.get)),
+            "base": array("i", self._base).tobytes(),
+            "check": array("i", self._check).tobytes(),
+            "fail": array("i", self._fail).tobytes(),
+            "report": array("i", self._report).tobytes(),
+            "outputs": self._outputs
+        }
+
+    @classmethod
+    def from_index(cls, index):
+        """Rebuild a matcher from to_index() output without recompiling the automaton"""
+        def unpack(data):
+            values = array("i")
+            values.frombytes(data)
+            return values.tolist()
+
+        matcher = cls.__new__(cls)
+        matcher.categories = index["categories"]
+        matcher.terms = index["terms"]
+        matcher.term_entries = index["term_entries"]
+        matcher._term_ids = {term: term_id for term_id, term in enumerate(matcher.terms)}
+        matcher._alphabet = {ch: code for code, ch in enumerate(index["alphabet"], 1)}
+        matcher._base = unpack(index["base"])
+        matcher._check = unpack(index["check"])
+        matcher._fail = unpack(index["fail"])
+        matcher._report = unpack(index["report"])
+        matcher._outputs = index["outputs"]
+        return matcher
+
+    def match(self, text):
+        """Return the set of term ids found in an already lowercased text"""
+        alphabet = self._alphabet
+        base = self._base
+        check = self._check
+        fail = self._fail
+        report = self._report
+        outputs = self._outputs
+        length = len(text)
+        found = set()
+
+        state = 0
+        for end, ch in enumerate(text):
+            code = alphabet.get(ch)
+            if code is None:
+                # No keyword contains this character
+                state = 0
+                continue
+            while True:
+                target = base[state] + code
+                if check[target] == state:
+                    state = target
+                    break
+                if not state:
+                    break
+                state = fail[state]
+
+            hit = report[state]
+            if hit == FREE:
+                continue
+
+            after = end + 1
+            after_is_word = after < length and _is_word_char(text[after])
+            # Walk every pattern ending here, longest first
+            while hit != FREE:
+                for term_length, first_is_word, last_is_word, term_id in outputs[hit]:
+                    if term_id in found or after_is_word == last_is_word:
+                        continue
+                    start = after - term_length
+                    before_is_word = start > 0 and _is_word_char(text[start - 1])
+                    if before_is_word != first_is_word:
+                        found.add(term_id)
+                hit = report[fail[hit]]
+
+        return found
+
+    def extract(self, text):
+        """
+        Return the keywords found in a text, grouped by category
+
+        Keywords are listed in taxonomy order within each category.
+        """
+        return self.group(self.match(text.lower()))
+
+    def group(self, term_ids):
+        """Group term ids returned by match() by category, in taxonomy order"""
+        hits = {category: [] for category in self.categories}
+        for term_id in term_ids:
+            for category, position in self.term_entries[term_id]:
+                hits[category].append((position, self.terms[term_id]))
+
+        return {category: [term for _, term in sorted(found)] for category, found in hits.items()}
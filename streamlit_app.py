@@ -7,11 +7,16 @@ from crewai import LLM
 import litellm
 import openai
 import os
+import io
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from dotenv import load_dotenv
 from crewai_tools import FileReadTool, FileWriterTool
 import streamlit as st
+from generation_cache import CREW_MODEL, GenerationCache
+from crew_streaming import CrewRun, stream_to_page
+from batch_generation import (BATCH_CONCURRENCY, BatchArchive, BatchError, BatchGenerator, archive_name,
+                              read_batch_csv)
 
 load_dotenv()
 
@@ -33,84 +38,120 @@ with st.sidebar:
     company_name=st.text_input("Company Name")
     st.markdown("-----")
 
+    stream_output = st.checkbox("Stream output", value=True, help="Show progress and the text while it is generated")
+    regenerate = st.checkbox("Regenerate", help="Ignore content generated earlier for the same details")
     generate_button = st.button("Generate Content", type="primary", use_container_width=True)
+    st.markdown("-----")
 
-def generate_content(job_title,key_responsiblity,required_skills,experience,location,salary,company_name):
+    st.header("Batch Generation")
+    batch_file = st.file_uploader(
+        "Postings CSV",
+        type="csv",
+        help="One posting per row, with columns named like the fields above, e.g. Job Title, Required Skills"
+    )
+    batch_concurrency = st.number_input("Concurrent Generations", min_value=1, max_value=32, value=BATCH_CONCURRENCY)
+    batch_button = st.button("Generate Batch", use_container_width=True, disabled=batch_file is None)
 
-        # Create a senior blog content researcher
-        hr_manager = Agent(
-            role='Senior HR Manager',
-            goal='Generate job descriptions for new positions',
-            description='Generate industry-accepted, official, and well-structured job descriptions based on provided details',
-            verbose=True,
-            memory=True,
-            backstory=(
+# Agent and task prompts. They are part of the generation cache key, so editing
+# one makes the next submission generate fresh content.
+PROMPTS = {
+    "hr_manager": {
+        "role": 'Senior HR Manager',
+        "goal": 'Generate job descriptions for new positions',
+        "description": 'Generate industry-accepted, official, and well-structured job descriptions based on provided details',
+        "backstory": (
             "You are an expert in creating job descriptions that are professional, well-structured, and adhere to industry standards. "
             "Generate a job description using the provided details: {job_title}, {key_responsibility}, {required_skills}, {experience}, {location}, and {salary},{company_name}. "
             "Ensure the job description is clear, concise, and appealing to potential candidates."
             "It should be very detailed and lengthy"
-            ),
-            allow_delegation=True,
         )
-
-        # Create a reporting analyst agent
-        hr_writer = Agent(
-            role='Senior HR Writer',
-            goal='Generate the job description content based on provided details',
-            description='Generate well-structured and professional job descriptions for new positions',
-            verbose=True,
-            memory=True,
-            backstory=(
+    },
+    "hr_writer": {
+        "role": 'Senior HR Writer',
+        "goal": 'Generate the job description content based on provided details',
+        "description": 'Generate well-structured and professional job descriptions for new positions',
+        "backstory": (
             "You are an expert in writing job descriptions that are clear, concise, and appealing to potential candidates. "
             "Ensure the job description includes all necessary details such as job title, key responsibilities, required skills, experience, location, and salary. "
             "The content should adhere to industry standards and be formatted professionally."
             "It should be very detailed and lengthy"
-            ),
-            allow_delegation=True,
-            tools=[FileWriterTool()]
         )
-
-        research_task = Task(
-            description=(
+    },
+    "research_task": {
+        "description": (
             "Generate a detailed and accurate job description for the new position. "
             "Ensure that all provided details such as {job_title}, {key_responsibility}, {required_skills}, {experience}, {location}, and {salary},{company_name} are included. "
             "The job description should be professional, clear, concise, and appealing to potential candidates. "
             "It should adhere to industry standards and be well-structured."
-            ),
-            expected_output='A professionally written job description with all the provided details accurately included and well structured.',
-            agent=hr_manager,
-        )
-
-        reporting_task = Task(
-            description=(
+        ),
+        "expected_output": 'A professionally written job description with all the provided details accurately included and well structured.'
+    },
+    "reporting_task": {
+        "description": (
             "Write a detailed and professional job description based on the provided details. "
             "Ensure the description is well-structured, error-free, and adheres to industry standards. "
             "Include all necessary information such as {job_title}, {key_responsibility}, {required_skills}, {experience}, {location}, and {salary},{company_name}."
-            ),
-            expected_output='A professionally written job description with all the provided details accurately included and well structured.',
-            agent=hr_writer,
+        ),
+        "expected_output": 'A professionally written job description with all the provided details accurately included and well structured.'
+    }
+}
+
+def build_crew(llm=CREW_MODEL, step_callback=None, task_callback=None):
+
+        # Create a senior blog content researcher
+        hr_manager = Agent(
+            **PROMPTS["hr_manager"],
+            llm=llm,
+            verbose=True,
+            memory=True,
+            allow_delegation=True,
+        )
+
+        # Create a reporting analyst agent
+        hr_writer = Agent(
+            **PROMPTS["hr_writer"],
+            llm=llm,
+            verbose=True,
+            memory=True,
+            allow_delegation=True,
+            tools=[FileWriterTool()]
         )
 
+        research_task = Task(**PROMPTS["research_task"], agent=hr_manager)
+
+        reporting_task = Task(**PROMPTS["reporting_task"], agent=hr_writer)
+
         # Crew
         crew = Crew(
             agents=[hr_manager, hr_writer],
             tasks=[research_task, reporting_task],
             process=Process.sequential,
             verbose=True,
+            step_callback=step_callback,
+            task_callback=task_callback,
         )
 
         # Convert joining_date to string
         # joining_date_str = joining_date.strftime('%Y-%m-%d')
 
-        return crew.kickoff(inputs={
-            "job_title":job_title,
-            "key_responsibility":key_responsibility,
-            "required_skills":required_skills,
-            "experience":experience,
-            "location":location,
-            "salary":salary,
-            "company_name":company_name
-        })
+        return crew
+
+def generate_content(inputs):
+    return build_crew().kickoff(inputs=inputs).raw
+
+# Batch CSV columns: the form fields, also accepted under these names
+INPUT_FIELDS = ["job_title", "key_responsibility", "required_skills", "experience", "location", "salary", "company_name"]
+CSV_ALIASES = {
+    "job_title": ("title",),
+    "key_responsibility": ("key_responsibilities", "responsibilities", "responsibility"),
+    "required_skills": ("skills",),
+    "company_name": ("company",)
+}
+
+@st.cache_resource
+def get_generation_cache():
+    # One cache per server process, shared by all sessions
+    return GenerationCache()
 
 # def generate_pdf(content):
 #     pdf = FPDF()
@@ -122,30 +163,146 @@ def generate_content(job_title,key_responsiblity,required_skills,experience,loca
 
 # Main content area
 if generate_button:
-    with st.spinner("Generating Content...This may take a moment.."):
+    inputs = {
+        "job_title": job_title,
+        "key_responsibility": key_responsibility,
+        "required_skills": required_skills,
+        "experience": experience,
+        "location": location,
+        "salary": salary,
+        "company_name": company_name
+    }
+    generation_cache = get_generation_cache()
+    cache_key = GenerationCache.make_key(inputs, PROMPTS)
+
+    # Identical submissions are answered from the cache without calling the model
+    content = None if regenerate else generation_cache.get(cache_key)
+    if content is not None:
+        st.caption("Loaded from earlier generation. Tick \"Regenerate\" for a fresh version.")
+        st.markdown("### Generated Content")
+        st.markdown(content)
+    elif stream_output:
+        # Show agent progress and the answer while it is being written
+        st.markdown("### Generated Content")
+        status = st.empty()
+        output = st.empty()
         try:
-            result = generate_content(job_title, key_responsibility, required_skills, experience, location, salary,company_name)
-            if result:
-                st.markdown("### Generated Content")
-                st.markdown(result)
-
-                # Add download button for text
-                st.download_button(
-                    label="Download Content",
-                    data=result.raw,
-                    file_name=f"offer_letter.txt",
-                    mime="text/plain"
-                )
-                # Generate PDF and add download button for PDF
-                # pdf_data = generate_pdf(result.raw)
-                # st.download_button(
-                #     label="Download PDF",
-                #     data=pdf_data,
-                #     file_name=f"offer_letter.pdf",
-                #     mime="application/pdf"
-                # )
+            content = stream_to_page(CrewRun(build_crew, inputs, CREW_MODEL).start(), status, output)
+            if content:
+                generation_cache.set(cache_key, content)
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
+    else:
+        with st.spinner("Generating Content...This may take a moment.."):
+            try:
+                content = generate_content(inputs)
+                if content:
+                    generation_cache.set(cache_key, content)
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
+        if content:
+            st.markdown("### Generated Content")
+            st.markdown(content)
+
+    if content:
+        # Add download button for text
+        st.download_button(
+            label="Download Content",
+            data=content,
+            file_name=f"offer_letter.txt",
+            mime="text/plain"
+        )
+        # Generate PDF and add download button for PDF
+        # pdf_data = generate_pdf(content)
+        # st.download_button(
+        #     label="Download PDF",
+        #     data=pdf_data,
+        #     file_name=f"offer_letter.pdf",
+        #     mime="application/pdf"
+        # )
+
+# Batch mode: many postings from a CSV, generated concurrently into a zip
+def batch_zip(batch):
+    # Zip of the postings finished so far, with failures.csv listing failed rows
+    buffer = io.BytesIO()
+    archive = BatchArchive(buffer)
+    for index, content in sorted(batch["documents"].items()):
+        archive.add(archive_name(index, batch["rows"][index]["job_title"]), content)
+    for index, error in sorted(batch["failures"].items()):
+        archive.add_failure(index, batch["rows"][index]["job_title"], error)
+    archive.close()
+    return buffer.getvalue()
+
+if batch_button:
+    try:
+        rows = read_batch_csv(batch_file.getvalue(), INPUT_FIELDS, CSV_ALIASES, required=("job_title",))
+    except BatchError as e:
+        st.error(str(e))
+        rows = []
+    if rows:
+        # Finished postings live in the session, so a rerun that interrupts the
+        # batch (any widget interaction) does not lose them
+        st.session_state.batch = {"rows": rows, "documents": {}, "failures": {}}
+
+batch = st.session_state.get("batch")
+if batch is not None:
+    rows = batch["rows"]
+    documents = batch["documents"]
+    failures = batch["failures"]
+    pending = [index for index in range(len(rows)) if index not in documents and index not in failures]
+
+    st.markdown("### Batch Generation")
+    notice = st.empty()
+    resume_button = False
+    if pending and not batch_button:
+        with notice.container():
+            st.info(f"The batch was interrupted with {len(pending)} of {len(rows)} postings left.")
+            resume_button = st.button("Resume Batch")
+
+    if pending and (batch_button or resume_button):
+        notice.empty()
+        generation_cache = get_generation_cache()
+
+        def generate_row(index):
+            # Rows share the generation cache with the form
+            inputs = rows[index]
+            cache_key = GenerationCache.make_key(inputs, PROMPTS)
+            content = None if regenerate else generation_cache.get(cache_key)
+            if content is None:
+                content = generate_content(inputs)
+                if content:
+                    generation_cache.set(cache_key, content)
+            if content:
+                # Recorded by the worker, so crews still running when the
+                # script is interrupted are kept too
+                documents[index] = content
+            return content
+
+        progress = st.progress(0.0)
+        status = st.empty()
+        generator = BatchGenerator(generate_row, concurrency=int(batch_concurrency))
+        for index, content, error in generator.run(pending):
+            if error is not None or not content:
+                failures[index] = str(error or "Empty result")
+            finished = len(documents) + len(failures)
+            progress.progress(finished / len(rows))
+            status.text(f"{finished}/{len(rows)} finished, {len(failures)} failed, "
+                        f"{generator.retries} rate limit retries")
+        pending = []
+
+    if not pending:
+        if failures:
+            st.warning(f"{len(failures)} postings failed; see failures.csv in the zip.")
+        label = "Download Batch"
+    else:
+        label = f"Download Finished Postings ({len(documents)})"
+    if documents or failures:
+        st.download_button(
+            label=label,
+            data=batch_zip(batch),
+            file_name="job_descriptions.zip",
+            mime="application/zip"
+        )
 
 # Footer
 st.markdown("----")
@@ -12,6 +12,8 @@ from crewai.project import CrewBase, agent, crew, task
 from dotenv import load_dotenv
 from crewai_tools import FileReadTool, FileWriterTool
 import streamlit as st
+from generation_cache import CREW_MODEL, GenerationCache
+from crew_streaming import CrewRun, stream_to_page
 
 load_dotenv()
 
@@ -33,47 +35,39 @@ with st.sidebar:
     reason=st.text_input("Reason For Promotion")
     st.markdown("-----")
 
+    stream_output = st.checkbox("Stream output", value=True, help="Show progress and the text while it is generated")
+    regenerate = st.checkbox("Regenerate", help="Ignore content generated earlier for the same details")
     generate_button = st.button("Generate Content", type="primary", use_container_width=True)
 
-def generate_content(company_name,employee_name,current_role,new_role,new_salary,effect_date,reason):
-
-        # Create a senior blog content researcher
-        hr_manager = Agent(
-            role='HR Promotion Specialist',
-            goal='Generate promotion letters with a formal structure adhering to industry norms',
-            description='Specialized in writing promotion letters that are professional, well-structured, and maintain industry standards',
-            verbose=True,
-            memory=True,
-            backstory=(
+# Agent and task prompts. They are part of the generation cache key, so editing
+# one makes the next submission generate fresh content.
+PROMPTS = {
+    "hr_manager": {
+        "role": 'HR Promotion Specialist',
+        "goal": 'Generate promotion letters with a formal structure adhering to industry norms',
+        "description": 'Specialized in writing promotion letters that are professional, well-structured, and maintain industry standards',
+        "backstory": (
             "You are an expert in creating promotion letters that are formal, well-structured, and adhere to industry standards. "
             "Generate a promotion letter using the provided details: {company_name}, {employee_name}, {current_role}, {new_role}, {new_salary}, {effect_date}, and {reason}. "
             "Ensure the promotion letter is clear, concise, and professionally written. "
             "It should be very detailed and maintain a formal tone. "
             "The report should be very detailed and lengthy enough to meet industry standards."
-            ),
-            allow_delegation=True,
         )
-
-        # Create a reporting analyst agent
-        hr_writer = Agent(
-            role='Senior HR Writer',
-            goal='Write the promotion letter based on the content generated by the HR Promotion Specialist',
-            description='Generate well-structured and professional promotion letters',
-            verbose=True,
-            memory=True,
-            backstory=(
+    },
+    "hr_writer": {
+        "role": 'Senior HR Writer',
+        "goal": 'Write the promotion letter based on the content generated by the HR Promotion Specialist',
+        "description": 'Generate well-structured and professional promotion letters',
+        "backstory": (
             "You are an expert in writing promotion letters that are clear, concise, and professionally written. "
             "Ensure the promotion letter includes all necessary details such as company name, employee name, current role, new role, new salary, date of effect, and reason for promotion. "
             "The content should adhere to industry standards and be formatted professionally. "
             "It should be very detailed and maintain a formal tone. "
             "The report should be very detailed and lengthy enough to meet industry standards."
-            ),
-            allow_delegation=True,
-            tools=[FileWriterTool()]
         )
-
-        promotion_task = Task(
-            description=(
+    },
+    "promotion_task": {
+        "description": (
             "Generate a detailed and professional promotion letter. "
             "Ensure that all provided details such as {company_name}, {employee_name}, {current_role}, {new_role}, {new_salary}, {effect_date}, and {reason} are included. "
             "The promotion letter should be formal, well-structured, and adhere to industry standards. "
@@ -83,46 +77,71 @@ def generate_content(company_name,employee_name,current_role,new_role,new_salary
             "In place of name use the {employee_name}"
             "Do not write any made up infomration write only about the information given to you as input"
             "Generate the report in copyable format always"
-            ),
-            expected_output='A professionally written promotion letter with all the provided details accurately included and well structured.',
-            agent=hr_manager,
-        )
-
-        reporting_task = Task(
-            description=(
+        ),
+        "expected_output": 'A professionally written promotion letter with all the provided details accurately included and well structured.'
+    },
+    "reporting_task": {
+        "description": (
             "Write a detailed and professional promotion letter based on the provided details. "
             "Ensure the letter is well-structured, error-free, and adheres to industry standards. "
             "Include all necessary information such as {company_name}, {employee_name}, {current_role}, {new_role}, {new_salary}, {effect_date}, and {reason}. "
             "The report should be very detailed and lengthy enough to meet industry standards."
             "In place of date give a date that is 15 days before the {effect_date}"
-             "In place of name use the {employee_name}"
-             "Do not write any made up infomration write only about the information given to you as input"
-             "Generate the report in copyable format always"
-            ),
-            expected_output='A professionally written promotion letter with all the provided details accurately included and well structured.',
-            agent=hr_writer,
+            "In place of name use the {employee_name}"
+            "Do not write any made up infomration write only about the information given to you as input"
+            "Generate the report in copyable format always"
+        ),
+        "expected_output": 'A professionally written promotion letter with all the provided details accurately included and well structured.'
+    }
+}
+
+def build_crew(llm=CREW_MODEL, step_callback=None, task_callback=None):
+
+        # Create a senior blog content researcher
+        hr_manager = Agent(
+            **PROMPTS["hr_manager"],
+            llm=llm,
+            verbose=True,
+            memory=True,
+            allow_delegation=True,
         )
 
+        # Create a reporting analyst agent
+        hr_writer = Agent(
+            **PROMPTS["hr_writer"],
+            llm=llm,
+            verbose=True,
+            memory=True,
+            allow_delegation=True,
+            tools=[FileWriterTool()]
+        )
+
+        promotion_task = Task(**PROMPTS["promotion_task"], agent=hr_manager)
+
+        reporting_task = Task(**PROMPTS["reporting_task"], agent=hr_writer)
+
         # Crew
         crew = Crew(
             agents=[hr_manager, hr_writer],
             tasks=[promotion_task, reporting_task],
             process=Process.sequential,
             verbose=True,
+            step_callback=step_callback,
+            task_callback=task_callback,
         )
 
         # Convert joining_date to string
         # joining_date_str = joining_date.strftime('%Y-%m-%d')
 
-        return crew.kickoff(inputs={
-            "company_name": company_name,
-            "employee_name": employee_name,
-            "current_role": current_role,
-            "new_role": new_role,
-            "new_salary": new_salary,
-            "effect_date": effect_date,
-            "reason": reason
-        })
+        return crew
+
+def generate_content(inputs):
+    return build_crew().kickoff(inputs=inputs).raw
+
+@st.cache_resource
+def get_generation_cache():
+    # One cache per server process, shared by all sessions
+    return GenerationCache()
 
 # def generate_pdf(content):
 #     pdf = FPDF()
@@ -134,30 +153,63 @@ def generate_content(company_name,employee_name,current_role,new_role,new_salary
 
 # Main content area
 if generate_button:
-    with st.spinner("Generating Content...This may take a moment.."):
+    inputs = {
+        "company_name": company_name,
+        "employee_name": employee_name,
+        "current_role": current_role,
+        "new_role": new_role,
+        "new_salary": new_salary,
+        "effect_date": effect_date,
+        "reason": reason
+    }
+    generation_cache = get_generation_cache()
+    cache_key = GenerationCache.make_key(inputs, PROMPTS)
+
+    # Identical submissions are answered from the cache without calling the model
+    content = None if regenerate else generation_cache.get(cache_key)
+    if content is not None:
+        st.caption("Loaded from earlier generation. Tick \"Regenerate\" for a fresh version.")
+        st.markdown("### Generated Content")
+        st.markdown(content)
+    elif stream_output:
+        # Show agent progress and the answer while it is being written
+        st.markdown("### Generated Content")
+        status = st.empty()
+        output = st.empty()
         try:
-            result = generate_content(company_name, employee_name, current_role, new_role, new_salary, effect_date, reason)
-            if result:
-                st.markdown("### Generated Content")
-                st.markdown(result)
-
-                # Add download button for text
-                st.download_button(
-                    label="Download Content",
-                    data=result.raw,
-                    file_name=f"offer_letter.txt",
-                    mime="text/plain"
-                )
-                # Generate PDF and add download button for PDF
-                # pdf_data = generate_pdf(result.raw)
-                # st.download_button(
-                #     label="Download PDF",
-                #     data=pdf_data,
-                #     file_name=f"offer_letter.pdf",
-                #     mime="application/pdf"
-                # )
+            content = stream_to_page(CrewRun(build_crew, inputs, CREW_MODEL).start(), status, output)
+            if content:
+                generation_cache.set(cache_key, content)
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
+    else:
+        with st.spinner("Generating Content...This may take a moment.."):
+            try:
+                content = generate_content(inputs)
+                if content:
+                    generation_cache.set(cache_key, content)
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
+        if content:
+            st.markdown("### Generated Content")
+            st.markdown(content)
+
+    if content:
+        # Add download button for text
+        st.download_button(
+            label="Download Content",
+            data=content,
+            file_name=f"offer_letter.txt",
+            mime="text/plain"
+        )
+        # Generate PDF and add download button for PDF
+        # pdf_data = generate_pdf(content)
+        # st.download_button(
+        #     label="Download PDF",
+        #     data=pdf_data,
+        #     file_name=f"offer_letter.pdf",
+        #     mime="application/pdf"
+        # )
 
 # Footer
 st.markdown("----")
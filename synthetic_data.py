@@ -0,0 +1,144 @@
+"""
+Seeded synthetic resumes and job descriptions for benchmarks
+
+The same seed and settings always produce the same documents, so timings
+from different runs are comparable.
+"""
+import random
+
+from document_features import ACTION_VERBS, SECTION_HEADINGS
+
+BULLET_STYLES = {
+    "dot": "•",
+    "dash": "-",
+    "star": "*",
+    "numbered": None,
+    "none": ""
+}
+
+FILLER_WORDS = [
+    "the", "new", "internal", "customer", "platform", "service", "team", "system", "release",
+    "process", "reporting", "pipeline", "feature", "quarterly", "support", "legacy", "tooling",
+    "migration", "across", "several", "regional", "offices", "with", "for", "and", "daily",
+    "critical", "product", "workflow", "stakeholders", "partners", "testing", "delivery"
+]
+
+OUTCOMES = [
+    "increasing revenue by {n}%", "cutting costs by ${n}k", "serving {n} users",
+    "reducing latency by {n} percent", "onboarding {n} customers", "supporting {n} projects",
+    "growing the team to {n} engineers", "saving {n} hours per week"
+]
+
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie"]
+LAST_NAMES = ["Lee", "Patel", "Garcia", "Nguyen", "Smith", "Kim", "Okafor", "Novak"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Hooli"]
+DEGREES = ["Bachelor of Science", "Master of Science", "Bachelor of Arts", "PhD"]
+
+
+class SyntheticCorpus:
+    """
+    Generator for resumes and job descriptions built from the analyzer's taxonomy
+
+    Parameters:
+    skills_keywords (dict): Skill categories mapped to skill lists
+    job_titles (list): Known job titles
+    seed (int): Seed for the random generator
+    """
+
+    def __init__(self, skills_keywords, job_titles, seed=0):
+        self.skills = [skill for skills in skills_keywords.values() for skill in skills]
+        self.job_titles = job_titles
+        self.rng = random.Random(seed)
+
+    def _phrase(self, words, skill_density):
+        # Filler words with a skill swapped in at roughly skill_density of the slots
+        parts = []
+        for _ in range(words):
+            if self.rng.random() < skill_density:
+                parts.append(self.rng.choice(self.skills))
+            else:
+                parts.append(self.rng.choice(FILLER_WORDS))
+        return " ".join(parts)
+
+    def _bullet(self, index, bullet_style, skill_density):
+        verb = self.rng.choice(ACTION_VERBS).capitalize()
+        outcome = self.rng.choice(OUTCOMES).format(n=self.rng.randint(2, 500))
+        line = f"{verb} {self._phrase(self.rng.randint(6, 14), skill_density)}, {outcome}."
+        marker = BULLET_STYLES[bullet_style]
+        if marker is None:
+            return f"{index}. {line}"
+        return f"{marker} {line}" if marker else line
+
+    def resume(self, words=500, skill_density=0.1, bullet_style="dot"):
+        """
+        Generate one resume of roughly the requested length
+
+        Parameters:
+        words (int): Approximate number of words
+        skill_density (float): Share of free-text words replaced by skills, 0 to 1
+        bullet_style (str): One of BULLET_STYLES
+
+        Returns:
+        str: Resume text
+        """
+        if bullet_style not in BULLET_STYLES:
+            raise ValueError(f"Unknown bullet style: {bullet_style}")
+
+        name = f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+        lines = [
+            name,
+            name.lower().replace(" ", ".") + "@example.com",
+            f"({self.rng.randint(200, 999)}) {self.rng.randint(200, 999)}-{self.rng.randint(1000, 9999)}",
+            "",
+            "Summary",
+            f"{self.rng.choice(self.job_titles).title()} with {self.rng.randint(1, 20)} years of experience "
+            f"in {self._phrase(8, skill_density)}.",
+            "",
+            "Skills",
+            ", ".join(self.rng.sample(self.skills, min(len(self.skills), 8))),
+            "",
+            "Education",
+            f"{self.rng.choice(DEGREES)} in {self._phrase(3, skill_density)}, University of "
+            f"{self.rng.choice(LAST_NAMES)}, {self.rng.randint(1995, 2022)}.",
+            "",
+            "Experience"
+        ]
+
+        count = sum(len(line.split()) for line in lines)
+        while count < words:
+            title = f"{self.rng.choice(self.job_titles).title()}, {self.rng.choice(COMPANIES)}"
+            start = self.rng.randint(2000, 2022)
+            entry = ["", title, f"{start} - {start + self.rng.randint(1, 4)}"]
+            for index in range(1, self.rng.randint(3, 6) + 1):
+                entry.append(self._bullet(index, bullet_style, skill_density))
+            lines.extend(entry)
+            count += sum(len(line.split()) for line in entry)
+
+        # Pad with remaining standard sections so every heading appears at least once
+        for heading in SECTION_HEADINGS:
+            if heading.title() not in lines:
+                lines.extend(["", heading.title(), self._phrase(6, skill_density) + "."])
+        return "\n".join(lines)
+
+    def job_description(self, words=200, skill_density=0.15):
+        """
+        Generate one job description of roughly the requested length
+
+        Parameters:
+        words (int): Approximate number of words
+        skill_density (float): Share of free-text words replaced by skills, 0 to 1
+
+        Returns:
+        str: Job description text
+        """
+        lines = [
+            f"We are hiring a {self.rng.choice(self.job_titles)} at {self.rng.choice(COMPANIES)}.",
+            "",
+            "Requirements"
+        ]
+        count = sum(len(line.split()) for line in lines)
+        while count < words:
+            line = f"- Experience with {self._phrase(self.rng.randint(5, 12), skill_density)}."
+            lines.append(line)
+            count += len(line.split())
+        return "\n".join(lines)
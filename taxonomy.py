@@ -0,0 +1,273 @@
+"""
+Skills and job title taxonomy loaded from a file
+
+The source is a JSON file:
+
+    {
+        "skills": {
+            "technical": ["python", {"name": "kubernetes", "aliases": ["k8s"]}],
+            "soft": ["communication"]
+        },
+        "job_titles": ["software engineer", {"name": "ux designer", "aliases": ["ux/ui designer"]}]
+    }
+
+Each entry is a canonical name, or an object with a name and aliases.
+Aliases are matched like the name but always reported as the name.
+
+Compiling the matching automata for a large taxonomy takes far longer than
+starting the service, so load_taxonomy() keeps a compiled index next to the
+source (or at index_path). It recompiles only when the source changes or
+the index was written by a different format or Python version.
+"""
+import gc
+import hashlib
+import json
+import marshal
+import os
+import struct
+import sys
+import tempfile
+
+from skill_matcher import SkillMatcher
+
+# Bump when the layout of the compiled index changes
+TAXONOMY_INDEX_FORMAT = 1
+
+INDEX_MAGIC = b'NXTX'
+INDEX_SUFFIX = '.idx'
+
+
+class TaxonomyError(ValueError):
+    """Raised when a taxonomy source file is malformed"""
+
+
+def _parse_entries(entries, where):
+    # Returns the canonical names in order and the alias -> name mapping
+    names = []
+    aliases = {}
+    if not isinstance(entries, list):
+        raise TaxonomyError(f'{where} must be a list')
+    for entry in entries:
+        if isinstance(entry, str):
+            names.append(entry.lower())
+            continue
+        if not isinstance(entry, dict) or not isinstance(entry.get('name'), str):
+            raise TaxonomyError(f'Entries of {where} must be strings or objects with a name')
+        name = entry['name'].lower()
+        names.append(name)
+        for alias in entry.get('aliases', []):
+            if not isinstance(alias, str):
+                raise TaxonomyError(f'Aliases of {name!r} in {where} must be strings')
+            alias = alias.lower()
+            if aliases.get(alias, name) != name:
+                raise TaxonomyError(f'Alias {alias!r} in {where} refers to both {aliases[alias]!r} and {name!r}')
+            aliases[alias] = name
+    return names, aliases
+
+
+def read_taxonomy(data):
+    """
+    Parse taxonomy source JSON
+
+    Parameters:
+    data (bytes): Contents of the source file
+
+    Returns:
+    tuple: (skills_keywords, skill_aliases, job_titles, title_aliases)
+    """
+    try:
+        source = json.loads(data)
+    except ValueError as e:
+        raise TaxonomyError(f'Taxonomy is not valid JSON: {e}')
+    if not isinstance(source, dict) or not isinstance(source.get('skills'), dict):
+        raise TaxonomyError('Taxonomy must be an object with a "skills" object')
+
+    skills_keywords = {}
+    skill_aliases = {}
+    for category, entries in source['skills'].items():
+        names, aliases = _parse_entries(entries, f'skills.{category}')
+        skills_keywords[category] = names
+        for alias, name in aliases.items():
+            if skill_aliases.get(alias, name) != name:
+                raise TaxonomyError(f'Alias {alias!r} refers to both {skill_aliases[alias]!r} and {name!r}')
+            skill_aliases[alias] = name
+
+    job_titles, title_aliases = _parse_entries(source.get('job_titles', []), 'job_titles')
+    return skills_keywords, skill_aliases, job_titles, title_aliases
+
+
+class Taxonomy:
+    """
+    Compiled skills and job title taxonomy
+
+    Pickling a Taxonomy that was loaded from a file stores only the paths,
+    so process pool workers reload the compiled index instead of receiving
+    a copy of the automata.
+
+    Attributes:
+    skills_keywords (dict): Category mapped to canonical skill names
+    job_titles (list): Canonical job titles
+    skill_matcher (SkillMatcher): Matcher for skills and their aliases
+    title_matcher (SkillMatcher): Matcher for job titles and their aliases
+    fingerprint (str): Hash of the source, identifies the taxonomy in cache keys
+    """
+
+    def __init__(self, skills_keywords, job_titles, skill_matcher, title_matcher, fingerprint):
+        self.skills_keywords = skills_keywords
+        self.job_titles = job_titles
+        self.skill_matcher = skill_matcher
+        self.title_matcher = title_matcher
+        self.fingerprint = fingerprint
+        self.source_path = None
+        self.index_path = None
+
+    def __reduce__(self):
+        if self.source_path is None:
+            return object.__reduce__(self)
+        return load_taxonomy, (self.source_path, self.index_path)
+
+
+def compile_taxonomy(data):
+    """Compile taxonomy source JSON into a Taxonomy"""
+    skills_keywords, skill_aliases, job_titles, title_aliases = read_taxonomy(data)
+    try:
+        skill_matcher = SkillMatcher(skills_keywords, skill_aliases)
+        title_matcher = SkillMatcher({'titles': job_titles}, title_aliases)
+    except ValueError as e:
+        raise TaxonomyError(str(e))
+    return Taxonomy(skills_keywords, job_titles, skill_matcher, title_matcher,
+                    hashlib.sha256(data).hexdigest())
+
+
+def _index_header(stat, fingerprint):
+    return {
+        'format': TAXONOMY_INDEX_FORMAT,
+        'python': list(sys.version_info[:2]),
+        'source_size': stat.st_size,
+        'source_mtime_ns': stat.st_mtime_ns,
+        'source_sha256': fingerprint
+    }
+
+
+def _read_index(index_path):
+    # Returns (header, payload bytes) or (None, None) when there is no usable index
+    try:
+        with open(index_path, 'rb') as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                return None, None
+            header_size, = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(header_size))
+            return header, f.read()
+    except (OSError, ValueError, struct.error):
+        return None, None
+
+
+def save_index(taxonomy, index_path, stat):
+    """Write a compiled taxonomy index atomically"""
+    payload = marshal.dumps({
+        'skills_keywords': taxonomy.skills_keywords,
+        'job_titles': taxonomy.job_titles,
+        'skill_matcher': taxonomy.skill_matcher.to_index(),
+        'title_matcher': taxonomy.title_matcher.to_index()
+    })
+    header = json.dumps(_index_header(stat, taxonomy.fingerprint)).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(index_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.taxonomy-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(INDEX_MAGIC + struct.pack('<I', len(header)) + header + payload)
+        # mkstemp creates the file readable by its owner only
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, index_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_taxonomy(path, index_path=None):
+    """
+    Load a taxonomy, compiling it only when its index is missing or stale
+
+    The index is trusted without reading the source when the source size and
+    modification time match the ones recorded in it; otherwise the source is
+    hashed, and only a changed hash triggers a recompile. A missing or
+    unwritable index location just means compiling in memory.
+
+    Parameters:
+    path (str): Taxonomy source JSON file
+    index_path (str): Compiled index location, defaults to path + '.idx'
+
+    Returns:
+    Taxonomy: The loaded taxonomy
+    """
+    index_path = index_path or path + INDEX_SUFFIX
+    stat = os.stat(path)
+    header, payload = _read_index(index_path)
+
+    compatible = (
+        header is not None
+        and header.get('format') == TAXONOMY_INDEX_FORMAT
+        and header.get('python') == list(sys.version_info[:2])
+    )
+    fresh = compatible and header['source_size'] == stat.st_size and header['source_mtime_ns'] == stat.st_mtime_ns
+
+    data = None
+    if compatible and not fresh:
+        # Touched but possibly unchanged; compare contents before recompiling
+        with open(path, 'rb') as f:
+            data = f.read()
+        fresh = hashlib.sha256(data).hexdigest() == header['source_sha256']
+
+    if fresh:
+        # Millions of objects are created at once; pausing the cyclic GC avoids
+        # repeatedly rescanning them
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            index = marshal.loads(payload)
+            taxonomy = Taxonomy(
+                index['skills_keywords'], index['job_titles'],
+                SkillMatcher.from_index(index['skill_matcher']), SkillMatcher.from_index(index['title_matcher']),
+                header['source_sha256']
+            )
+        finally:
+            if gc_enabled:
+                gc.enable()
+        if data is not None:
+            # Record the new modification time so the next load skips hashing
+            try:
+                save_index(taxonomy, index_path, stat)
+            except OSError:
+                pass
+    else:
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        taxonomy = compile_taxonomy(data)
+        try:
+            save_index(taxonomy, index_path, stat)
+        except OSError:
+            pass
+
+    taxonomy.source_path = path
+    taxonomy.index_path = index_path
+    return taxonomy
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compile a taxonomy file into its index, e.g. at build time')
+    parser.add_argument('path', help='Taxonomy source JSON file')
+    parser.add_argument('--index', help='Index location, defaults to PATH.idx')
+    args = parser.parse_args(argv)
+
+    taxonomy = load_taxonomy(args.path, args.index)
+    print(f'{sum(len(names) for names in taxonomy.skills_keywords.values())} skills, '
+          f'{len(taxonomy.job_titles)} job titles, index at {taxonomy.index_path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""
+Text extraction for uploaded resumes
+
+PDF and DOCX files are detected from their magic bytes and converted to
+plain text in separate worker processes, so a huge or malformed document
+can only stall its own worker. Workers are killed and replaced when they
+exceed the time limit or crash. PDF support needs the optional pypdf
+package; DOCX is read with the standard library.
+"""
+import io
+import os
+import queue
+import subprocess
+import sys
+import threading
+import zipfile
+from multiprocessing.connection import Connection
+from xml.etree import ElementTree
+
+from result_cache import ResultCache
+
+PDF_MAGIC = b'%PDF-'
+ZIP_MAGIC = b'PK\x03\x04'
+OLE_MAGIC = b'\xd0\xcf\x11\xe0'
+
+DOCX_DOCUMENT = 'word/document.xml'
+WORD_NAMESPACE = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(ValueError):
+    """Raised when text cannot be extracted from an upload"""
+
+
+def detect_format(data):
+    """Return 'pdf', 'docx' or 'text' based on the leading bytes of a file"""
+    if data.startswith(PDF_MAGIC):
+        return 'pdf'
+    if data.startswith(ZIP_MAGIC):
+        return 'docx'
+    if data.startswith(OLE_MAGIC):
+        raise ExtractionError('Legacy .doc files are not supported; please upload PDF, DOCX or text')
+    return 'text'
+
+
+def extract_pdf(data, max_pages):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise ExtractionError('PDF support requires the pypdf package')
+
+    reader = PdfReader(io.BytesIO(data))
+    if len(reader.pages) > max_pages:
+        raise ExtractionError(f'PDF has {len(reader.pages)} pages; the limit is {max_pages}')
+    return '\n\n'.join(page.extract_text() or '' for page in reader.pages)
+
+
+def extract_docx(data, max_pages, max_xml_size=20 * 1024 * 1024):
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile:
+        raise ExtractionError('File is neither a valid DOCX document nor text')
+
+    with archive:
+        try:
+            info = archive.getinfo(DOCX_DOCUMENT)
+        except KeyError:
+            raise ExtractionError('Zip file is not a DOCX document')
+        # Guard against decompression bombs before inflating the body
+        if info.file_size > max_xml_size:
+            raise ExtractionError('DOCX document body is too large')
+
+        paragraphs = []
+        page_breaks = 0
+        with archive.open(info) as document:
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == WORD_NAMESPACE + 'p':
+                    parts = []
+                    for node in element.iter():
+                        if node.tag == WORD_NAMESPACE + 't' and node.text:
+                            parts.append(node.text)
+                        elif node.tag == WORD_NAMESPACE + 'tab':
+                            parts.append('\t')
+                        elif node.tag == WORD_NAMESPACE + 'br':
+                            if node.get(WORD_NAMESPACE + 'type') == 'page':
+                                page_breaks += 1
+                            parts.append('\n')
+                    paragraphs.append(''.join(parts))
+                    element.clear()
+
+        if page_breaks + 1 > max_pages:
+            raise ExtractionError(f'DOCX has {page_breaks + 1} pages; the limit is {max_pages}')
+        return '\n'.join(paragraphs)
+
+
+EXTRACTORS = {
+    'pdf': extract_pdf,
+    'docx': extract_docx
+}
+
+
+def _worker_main(max_memory):
+    # Runs in a worker process: extract one file per message until the parent goes away.
+    # Messages travel over the original stdout; fd 1 is pointed at stderr so
+    # anything a parser prints cannot corrupt the channel.
+    receiver = Connection(os.dup(sys.stdin.fileno()), writable=False)
+    sender = Connection(os.dup(sys.stdout.fileno()), readable=False)
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    if max_memory:
+        try:
+            import resource
+            resource.setrlimit(resource.RLIMIT_AS, (max_memory, max_memory))
+        except (ImportError, ValueError, OSError):
+            pass
+
+    while True:
+        try:
+            file_format, data, max_pages = receiver.recv()
+        except EOFError:
+            return
+        try:
+            sender.send(('ok', EXTRACTORS[file_format](data, max_pages)))
+        except ExtractionError as e:
+            sender.send(('error', str(e)))
+        except MemoryError:
+            sender.send(('error', 'Document needs too much memory to extract'))
+        except Exception as e:
+            sender.send(('error', f'Could not read {file_format.upper()} file: {e}'))
+
+
+class _Worker:
+    # A fresh interpreter running this module, so nothing from the web worker is inherited
+    def __init__(self, max_memory):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), str(max_memory or 0)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.sender = Connection(os.dup(self.process.stdin.fileno()), readable=False)
+        self.receiver = Connection(os.dup(self.process.stdout.fileno()), writable=False)
+
+    def kill(self):
+        self.process.kill()
+        self.process.wait()
+        for channel in (self.sender, self.receiver, self.process.stdin, self.process.stdout):
+            channel.close()
+
+
+class TextExtractor:
+    """
+    Turns uploaded resume bytes into text
+
+    Plain text is decoded in-process. PDF and DOCX files go to a pool of
+    worker processes with limits on file size, page count, wall time and,
+    where the platform supports it, memory. Extracted text is cached by file
+    hash, so a re-upload skips extraction entirely.
+
+    Parameters:
+    workers (int): Maximum number of extraction processes
+    timeout (float): Seconds allowed per file before its worker is killed
+    max_bytes (int): Largest PDF or DOCX accepted
+    max_pages (int): Most pages accepted per document
+    max_memory (int): Address-space limit per worker in bytes, or None
+    cache (ResultCache): Cache for extracted text; a small in-memory one by default
+    """
+
+    def __init__(self, workers=2, timeout=10.0, max_bytes=10 * 1024 * 1024, max_pages=20,
+                 max_memory=None, cache=None):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.max_pages = max_pages
+        self.max_memory = max_memory
+        self.cache = cache if cache is not None else ResultCache(max_entries=256, ttl=None)
+        self._idle = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def extract(self, data):
+        """Return the text of an uploaded file, raising ExtractionError when it cannot be read"""
+        file_format = detect_format(data)
+        if file_format == 'text':
+            try:
+                return data.decode('utf-8')
+            except UnicodeDecodeError:
+                raise ExtractionError('File is not UTF-8 text, PDF or DOCX')
+
+        if len(data) > self.max_bytes:
+            raise ExtractionError(f'File exceeds the {self.max_bytes} byte limit')
+
+        cache_key = ResultCache.make_key('text-extraction', data, str(self.max_pages))
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached.decode('utf-8')
+
+        text = self._run(file_format, data)
+        self.cache.set(cache_key, text.encode('utf-8'))
+        return text
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().kill()
+            except queue.Empty:
+                return
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._started < self.workers:
+                    self._started += 1
+                    try:
+                        return _Worker(self.max_memory)
+                    except Exception:
+                        self._started -= 1
+                        raise
+            # Wake up periodically in case a killed worker freed a slot
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+    def _discard(self, worker):
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+
+    def _run(self, file_format, data):
+        worker = self._acquire()
+        try:
+            worker.sender.send((file_format, data, self.max_pages))
+            if not worker.receiver.poll(self.timeout):
+                self._discard(worker)
+                worker = None
+                raise ExtractionError(f'Text extraction took longer than {self.timeout} seconds')
+            status, payload = worker.receiver.recv()
+        except (EOFError, OSError):
+            # The worker died, e.g. after hitting its memory limit
+            self._discard(worker)
+            worker = None
+            raise ExtractionError('Text extraction failed for this file')
+        finally:
+            if worker is not None:
+                self._idle.put(worker)
+
+        if status == 'error':
+            raise ExtractionError(payload)
+        return payload
+
+
+if __name__ == '__main__':
+    _worker_main(int(sys.argv[1]))
@@ -1,8 +1,10 @@
-import pandas as pd
-import numpy as np
 from resume_analyzer import ResumeAnalyzer
+from feature_cache import FeatureCache
+from training_corpus import CorpusError, corpus_labels, iter_chunks, iter_corpus
+import argparse
 import json
 import os
+import sys
 
 def load_sample_data():
     """
@@ -103,24 +105,75 @@ def load_sample_data():
     
     return resumes, labels
 
-def main():
-    # Create the ResumeAnalyzer instance
-    analyzer = ResumeAnalyzer()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the resume classifier")
+    parser.add_argument("--corpus", help="Train out-of-core from a directory of label subdirectories "
+                                         "of .txt resumes, or a JSONL file, instead of the sample data")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Resumes held in memory at once (default: 1000)")
+    parser.add_argument("--update", metavar="MODEL", help="Continue training a model saved by an earlier --corpus run")
+    parser.add_argument("--text-field", default="text", help="Resume text field in a JSONL corpus")
+    parser.add_argument("--label-field", default="label", help="Label field in a JSONL corpus")
+    parser.add_argument("--output", default="resume_analyzer_model.pkl", help="Where to save the trained model")
+    parser.add_argument("--feature-cache", metavar="DIR", help="Reuse the TF-IDF features of a corpus seen in "
+                                                              "an earlier run, stored in this directory")
+    args = parser.parse_args()
+    if args.update and not args.corpus:
+        parser.error("--update needs --corpus")
+    if args.feature_cache and args.corpus:
+        parser.error("--feature-cache applies to in-memory training; --corpus hashes features as it reads")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    return args
+
+def train_from_corpus(analyzer, args):
+    """
+    Train from a corpus on disk, reading it in chunks of args.chunk_size resumes
     
-    # Load sample data
-    resumes, labels = load_sample_data()
+    Returns:
+    dict: Results of ResumeAnalyzer.train_streaming
+    """
+    if args.update:
+        analyzer.load_model(args.update)
     
-    print("Training model on sample data...")
+    print(f"Reading labels from {args.corpus}...")
+    labels = corpus_labels(args.corpus, args.text_field, args.label_field)
+    print(f"Training on {len(labels)} labels in chunks of {args.chunk_size} resumes...")
     
-    # Train the model
-    training_results = analyzer.train_model(resumes, labels)
+    pairs = iter_corpus(args.corpus, args.text_field, args.label_field)
+    return analyzer.train_streaming(iter_chunks(pairs, args.chunk_size), labels, update=bool(args.update))
+
+def main():
+    args = parse_args()
+    
+    # Create the ResumeAnalyzer instance
+    analyzer = ResumeAnalyzer()
     
-    print(f"Model trained with accuracy: {training_results['accuracy']:.2f}")
-    print("Classification Report:")
-    print(training_results["report"])
+    if args.corpus:
+        try:
+            training_results = train_from_corpus(analyzer, args)
+        except (CorpusError, ValueError) as e:
+            sys.exit(f"Error: {e}")
+        
+        accuracy = training_results["accuracy"]
+        print(f"Trained on {training_results['documents']} resumes in {training_results['chunks']} chunks")
+        if accuracy is not None:
+            print(f"Progressive accuracy: {accuracy:.2f}")
+    else:
+        # Load sample data
+        resumes, labels = load_sample_data()
+        
+        print("Training model on sample data...")
+        
+        # Train the model, vectorizing the corpus only if it is not cached yet
+        feature_cache = FeatureCache(args.feature_cache) if args.feature_cache else None
+        training_results = analyzer.train_model(resumes, labels, feature_cache=feature_cache)
+        
+        print(f"Model trained with accuracy: {training_results['accuracy']:.2f}")
+        print("Classification Report:")
+        print(training_results["report"])
     
     # Save the trained model
-    model_path = "resume_analyzer_model.pkl"
+    model_path = args.output
     analyzer.save_model(model_path)
     print(f"Model saved to {model_path}")
     
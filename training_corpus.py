@@ -0,0 +1,105 @@
+"""
+Read a labeled resume corpus from disk in bounded chunks
+
+Two layouts are supported:
+
+    corpus/                         corpus.jsonl
+        Data Scientist/                 {"text": "...", "label": "Data Scientist"}
+            0001.txt                    {"text": "...", "label": "UX Designer"}
+        UX Designer/
+            0002.txt
+
+In a directory, each subdirectory is a label and each .txt file in it one
+resume. In a JSONL file, each line is one resume, and lines should be in
+random order rather than grouped by label. Documents are read one at a
+time, so memory is bounded by the chunk size, not by the corpus.
+"""
+import json
+import os
+
+
+class CorpusError(ValueError):
+    """Raised when a training corpus is missing or malformed"""
+
+
+def _label_directories(path):
+    return sorted(name for name in os.listdir(path)
+                  if not name.startswith('.') and os.path.isdir(os.path.join(path, name)))
+
+
+def iter_directory(path):
+    """
+    Yield (text, label) for every .txt file in the label subdirectories of path
+
+    Labels are interleaved, one file from each in turn, because incremental
+    training on one label at a time would forget the earlier ones.
+    """
+    pending = []
+    for label in _label_directories(path):
+        directory = os.path.join(path, label)
+        names = sorted(name for name in os.listdir(directory)
+                       if not name.startswith('.') and name.lower().endswith('.txt'))
+        pending.append((label, directory, iter(names)))
+
+    while pending:
+        remaining = []
+        for label, directory, names in pending:
+            name = next(names, None)
+            if name is None:
+                continue
+            with open(os.path.join(directory, name), encoding='utf-8', errors='replace') as f:
+                yield f.read(), label
+            remaining.append((label, directory, names))
+        pending = remaining
+
+
+def iter_jsonl(path, text_field='text', label_field='label'):
+    """Yield (text, label) for every line of a JSONL file"""
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                text, label = record[text_field], record[label_field]
+            except (ValueError, KeyError, TypeError):
+                raise CorpusError(f'{path}:{line_number} is not a JSON object with '
+                                  f'"{text_field}" and "{label_field}"')
+            yield text, str(label)
+
+
+def iter_corpus(path, text_field='text', label_field='label'):
+    """Yield (text, label) pairs from a corpus directory or JSONL file"""
+    if os.path.isdir(path):
+        return iter_directory(path)
+    if os.path.isfile(path):
+        return iter_jsonl(path, text_field, label_field)
+    raise CorpusError(f'No corpus at {path}')
+
+
+def corpus_labels(path, text_field='text', label_field='label'):
+    """
+    Return the sorted set of labels in a corpus without keeping its documents
+
+    An incrementally trained classifier must know every class up front.
+    For a directory these are the subdirectory names; a JSONL file is read
+    once, one line at a time.
+    """
+    if os.path.isdir(path):
+        return _label_directories(path)
+    return sorted({label for _, label in iter_corpus(path, text_field, label_field)})
+
+
+def iter_chunks(pairs, chunk_size):
+    """Group (text, label) pairs into (texts, labels) lists of at most chunk_size"""
+    texts = []
+    labels = []
+    for text, label in pairs:
+        texts.append(text)
+        labels.append(label)
+        if len(texts) >= chunk_size:
+            yield texts, labels
+            texts = []
+            labels = []
+    if texts:
+        yield texts, labels